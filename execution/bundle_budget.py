@@ -0,0 +1,407 @@
+"""
+Production bundle budget check for farm-app.
+Analyzes a Vite build in farm-app/dist: raw/gzip/brotli size per chunk,
+bytes per source module (decoded from the source maps), dependencies bundled
+twice, and the initial download of every route against its budget. Each run
+is compared with the previous one stored in .tmp.
+
+Runs offline on an existing build - no network, no Node.
+
+Usage:
+    cd farm-app && BUNDLE_ANALYZE=1 npm run build   # hidden source maps + manifest
+    python bundle_budget.py                         # Analyze, compare, save
+    python bundle_budget.py --top 30                # Show more modules
+    python bundle_budget.py --baseline main.json    # Compare with another saved run
+    python bundle_budget.py --no-save               # Keep the stored baseline
+
+Exit code 1 when a route is over budget. Brotli sizes need `pip install brotli`.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+APP_DIR = Path(__file__).parent.parent / 'farm-app'
+DIST_DIR = APP_DIR / 'dist'
+OUTPUT_FILE = Path(__file__).parent.parent / '.tmp' / 'bundle_budget.json'
+
+# Route -> page module (see farm-app/src/App.jsx)
+ROUTES = {
+    '/': 'src/pages/Dashboard.jsx',
+    '/login': 'src/pages/Login.jsx',
+    '/livestock': 'src/pages/Livestock.jsx',
+    '/vegetables': 'src/pages/Agriculture.jsx',
+    '/fruits': 'src/pages/Fruits.jsx',
+    '/expenses': 'src/pages/Expenses.jsx',
+    '/employees': 'src/pages/Employees.jsx',
+    '/inventory': 'src/pages/Inventory.jsx',
+    '/invoices': 'src/pages/Invoices.jsx',
+    '/settings': 'src/pages/Settings.jsx',
+}
+
+# Gzipped KB of JS + CSS downloaded before a route can render. All pages are
+# in the entry chunk today, so every route pays for all of them; lower the
+# budgets as pages move to React.lazy() chunks.
+DEFAULT_BUDGET_KB = 700
+ROUTE_BUDGETS_KB = {}   # route -> KB, overrides the default
+
+CHUNK_WARN_KB = 500   # raw KB per chunk (Vite's chunkSizeWarningLimit)
+
+_HASH = re.compile(r'-[A-Za-z0-9_-]{8}(?=\.\w+$)')
+_BASE64 = {c: i for i, c in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')}
+
+
+def stable_name(file_name: str) -> str:
+    """Chunk file name without Vite's content hash (assets/index-Bx1c9QaZ.js -> assets/index.js)."""
+    return _HASH.sub('', file_name)
+
+
+def compressed_sizes(data: bytes) -> dict:
+    """Raw, gzip (level 9) and brotli (quality 11, None if unavailable) sizes."""
+    return {
+        'raw': len(data),
+        'gzip': len(gzip.compress(data, 9)),
+        'brotli': len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+def decode_vlq(segment: str) -> list:
+    """Decode one Base64 VLQ source map segment into its integer fields."""
+    values = []
+    value = shift = 0
+    for char in segment:
+        digit = _BASE64[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+
+def _span_bytes(line: str, start: int, end: int) -> int:
+    """UTF-8 bytes between two source map columns (UTF-16 code units)."""
+    if line.isascii():
+        return max(min(end, len(line)) - start, 0)
+    units = line.encode('utf-16-le')
+    return len(units[start * 2:end * 2].decode('utf-16-le', errors='ignore').encode('utf-8'))
+
+
+def attribute_bytes(code: str, source_map: dict) -> dict:
+    """
+    Bytes of generated code per source, from the map's mappings.
+
+    Each segment owns the code from its column up to the next segment on the
+    same line. Code before a line's first segment, or in segments without a
+    source, is counted as '(unmapped)'; newlines are not counted.
+    """
+    sources = source_map.get('sources', [])
+    totals = {}
+    source_index = 0
+    lines = code.split('\n')
+    for line_number, mapping in enumerate(source_map.get('mappings', '').split(';')):
+        if line_number >= len(lines):
+            break
+        line = lines[line_number]
+        line_length = len(line.encode('utf-16-le')) // 2
+        column = 0
+        spans = []
+        for segment in filter(None, mapping.split(',')):
+            fields = decode_vlq(segment)
+            column += fields[0]
+            if len(fields) >= 4:
+                source_index += fields[1]
+                spans.append((column, sources[source_index] if source_index < len(sources) else None))
+            else:
+                spans.append((column, None))
+        first = spans[0][0] if spans else line_length
+        if first:
+            totals['(unmapped)'] = totals.get('(unmapped)', 0) + _span_bytes(line, 0, first)
+        for i, (start, source) in enumerate(spans):
+            end = spans[i + 1][0] if i + 1 < len(spans) else line_length
+            key = source if source is not None else '(unmapped)'
+            totals[key] = totals.get(key, 0) + _span_bytes(line, start, end)
+    return totals
+
+
+def normalize_source(source: str, map_dir: Path, source_root: str = '', app_dir: Path = APP_DIR) -> str:
+    """Source map path -> path relative to the app (node_modules/... or src/...)."""
+    source = source.split('?')[0].replace('\\', '/')
+    if source.startswith(('\0', '(')) or ':' in source.split('/')[0]:
+        return source  # virtual modules, e.g. \0vite/preload-helper
+    path = Path(os.path.normpath(map_dir / source_root / source))
+    try:
+        return path.relative_to(app_dir.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def package_of(module: str):
+    """(package name, install path) for a node_modules module, else None."""
+    parts = module.split('/')
+    if 'node_modules' not in parts:
+        return None
+    index = len(parts) - 1 - parts[::-1].index('node_modules')
+    if index + 1 >= len(parts):
+        return None
+    length = 2 if parts[index + 1].startswith('@') else 1
+    name = '/'.join(parts[index + 1:index + 1 + length])
+    return name, '/'.join(parts[:index + 1 + length])
+
+
+def _package_version(install_path: str, app_dir: Path = APP_DIR):
+    try:
+        with open(app_dir / install_path / 'package.json') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(dist: Path) -> dict:
+    """Vite's .vite/manifest.json (build.manifest), or {} if it was not emitted."""
+    for path in (dist / '.vite' / 'manifest.json', dist / 'manifest.json'):
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+    return {}
+
+
+def analyze_chunks(dist: Path) -> dict:
+    """Sizes and per-module bytes for every JS/CSS file under dist (modules relative to its parent)."""
+    app_dir = dist.resolve().parent
+    chunks = {}
+    for path in sorted(dist.rglob('*')):
+        if path.suffix not in ('.js', '.css') or not path.is_file():
+            continue
+        name = path.relative_to(dist).as_posix()
+        data = path.read_bytes()
+        chunk = {'file': name, **compressed_sizes(data), 'modules': {}}
+
+        map_path = path.with_name(path.name + '.map')
+        if map_path.exists():
+            with open(map_path, encoding='utf-8') as f:
+                source_map = json.load(f)
+            raw = attribute_bytes(data.decode('utf-8', errors='replace'), source_map)
+            for source, size in raw.items():
+                module = normalize_source(source, map_path.parent.resolve(), source_map.get('sourceRoot') or '',
+                                          app_dir) if source != '(unmapped)' else source
+                chunk['modules'][module] = chunk['modules'].get(module, 0) + size
+        chunks[name] = chunk
+    return chunks
+
+
+def _closure(manifest: dict, key: str, files: set):
+    """Add a manifest entry's file, its CSS and its static imports to files."""
+    entry = manifest.get(key)
+    if not entry or entry['file'] in files:
+        return
+    files.add(entry['file'])
+    files.update(entry.get('css', []))
+    for imported in entry.get('imports', []):
+        _closure(manifest, imported, files)
+
+
+def route_costs(manifest: dict, chunks: dict, dist: Path = DIST_DIR) -> dict:
+    """
+    Initial JS + CSS per route: the entry's static import closure plus, for
+    lazily loaded pages, the closure of the page's own chunk.
+    """
+    entry_keys = [k for k, v in manifest.items() if v.get('isEntry')]
+    initial = set()
+    for key in entry_keys:
+        _closure(manifest, key, initial)
+    if not manifest:
+        # No manifest: assume everything linked from index.html is initial
+        index = dist / 'index.html'
+        html = index.read_text(encoding='utf-8') if index.exists() else ''
+        initial = {name for name in chunks if name in html}
+
+    costs = {}
+    for route, module in ROUTES.items():
+        files = set(initial)
+        lazy = module in manifest and not manifest[module].get('isEntry')
+        if lazy:
+            _closure(manifest, module, files)
+        files &= set(chunks)
+        own = sum(c['modules'].get(module, 0) for c in chunks.values())
+        costs[route] = {
+            'module': module,
+            'lazy': lazy,
+            'files': sorted(files),
+            'raw': sum(chunks[f]['raw'] for f in files),
+            'gzip': sum(chunks[f]['gzip'] for f in files),
+            'brotli': sum(chunks[f]['brotli'] for f in files) if brotli else None,
+            'module_raw': own,
+            'budget_gzip': ROUTE_BUDGETS_KB.get(route, DEFAULT_BUDGET_KB) * 1024,
+        }
+    return costs
+
+
+def find_duplicates(chunks: dict, app_dir: Path = APP_DIR) -> dict:
+    """
+    Dependencies bundled more than once: one package from several install
+    paths (different versions), or one module copied into several chunks.
+    """
+    installs = {}
+    module_chunks = {}
+    for name, chunk in chunks.items():
+        for module, size in chunk['modules'].items():
+            module_chunks.setdefault(module, []).append((name, size))
+            package = package_of(module)
+            if package:
+                installs.setdefault(package[0], {}).setdefault(package[1], 0)
+                installs[package[0]][package[1]] += size
+
+    packages = [
+        {'package': name, 'copies': [{'path': path, 'version': _package_version(path, app_dir), 'raw': size}
+                                     for path, size in sorted(paths.items())]}
+        for name, paths in sorted(installs.items()) if len(paths) > 1
+    ]
+    modules = [
+        {'module': module, 'chunks': [name for name, _ in found], 'wasted_raw': sum(s for _, s in found[1:])}
+        for module, found in module_chunks.items()
+        if len(found) > 1 and module != '(unmapped)'
+    ]
+    modules.sort(key=lambda m: -m['wasted_raw'])
+    return {'packages': packages, 'modules': modules}
+
+
+def module_totals(chunks: dict) -> list:
+    """Bytes per module (node_modules grouped per package) across all chunks."""
+    totals = {}
+    for chunk in chunks.values():
+        for module, size in chunk['modules'].items():
+            package = package_of(module)
+            key = package[0] if package else module
+            totals[key] = totals.get(key, 0) + size
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def _kb(size) -> str:
+    return f"{size / 1024:>8.1f}" if size is not None else '       -'
+
+
+def _delta(current, previous) -> str:
+    if previous is None:
+        return '     new'
+    change = (current - previous) / 1024
+    return f"{change:>+8.1f}" if change else '       ='
+
+
+def analyze(dist=DIST_DIR, top=15, baseline=None, save=True, output=OUTPUT_FILE):
+    """Analyze the build, print the report and save it. Returns False if over budget or no build."""
+    dist = Path(dist)
+    if not dist.exists():
+        print(f"❌ No build at {dist}. Run: cd farm-app && BUNDLE_ANALYZE=1 npm run build")
+        return False
+
+    manifest = load_manifest(dist)
+    chunks = analyze_chunks(dist)
+    if not chunks:
+        print(f"❌ No JS/CSS chunks in {dist}")
+        return False
+    if not manifest:
+        print("⚠️ No .vite/manifest.json - route costs assume every chunk in index.html is initial")
+    if not any(c['modules'] for c in chunks.values()):
+        print("⚠️ No source maps - module attribution and duplicate detection skipped")
+
+    baseline = Path(baseline) if baseline else Path(output)
+    previous = {}
+    if baseline.exists():
+        with open(baseline) as f:
+            previous = json.load(f)
+    prev_chunks = {stable_name(c['file']): c for c in previous.get('chunks', [])}
+    prev_routes = previous.get('routes', {})
+
+    routes = route_costs(manifest, chunks, dist)
+    duplicates = find_duplicates(chunks, dist.resolve().parent)
+    modules = module_totals(chunks)
+
+    since = f" (Δ KB vs {previous['generated'][:16]})" if previous else ''
+    print(f"[BUNDLE] {len(chunks)} chunks in {dist}{since}")
+    print(f"  {'chunk':<36} {'raw KB':>8} {'gzip KB':>8} {'br KB':>8} {'Δ gzip':>8}")
+    for chunk in sorted(chunks.values(), key=lambda c: -c['raw']):
+        old = prev_chunks.get(stable_name(chunk['file']))
+        mark = '⚠️' if chunk['raw'] > CHUNK_WARN_KB * 1024 else '  '
+        print(f"{mark}{stable_name(chunk['file']):<36} {_kb(chunk['raw'])} {_kb(chunk['gzip'])} {_kb(chunk['brotli'])} "
+              f"{_delta(chunk['gzip'], old['gzip'] if old else None)}")
+    removed = set(prev_chunks) - {stable_name(n) for n in chunks}
+    for name in sorted(removed):
+        print(f"  {name:<36} {'removed':>8}")
+
+    if modules:
+        total = sum(size for _, size in modules)
+        print(f"\nLargest modules (raw KB, share of code)")
+        for name, size in modules[:top]:
+            print(f"  {name:<48} {_kb(size)} {size / total * 100:>5.1f}%")
+
+    if duplicates['packages'] or duplicates['modules']:
+        print(f"\nDuplicated dependencies")
+        for package in duplicates['packages']:
+            copies = ', '.join(f"{c['version'] or '?'} ({c['raw'] / 1024:.1f} KB)" for c in package['copies'])
+            print(f"  ⚠️ {package['package']}: {len(package['copies'])} copies - {copies}")
+        for module in duplicates['modules'][:top]:
+            print(f"  ⚠️ {module['module']} in {len(module['chunks'])} chunks (+{module['wasted_raw'] / 1024:.1f} KB)")
+
+    over = []
+    print(f"\nRoute budgets (initial JS + CSS, gzip KB)")
+    for route, cost in routes.items():
+        old = prev_routes.get(route)
+        ok = cost['gzip'] <= cost['budget_gzip']
+        if not ok:
+            over.append(route)
+        print(f"  {'✅' if ok else '❌'} {route:<12} {_kb(cost['gzip'])} / {cost['budget_gzip'] / 1024:>5.0f}"
+              f" {_delta(cost['gzip'], old['gzip'] if old else None)}"
+              f"   page module {cost['module_raw'] / 1024:.1f} KB raw{' (lazy)' if cost['lazy'] else ''}")
+
+    report = {
+        'generated': datetime.now().isoformat(),
+        'dist': str(dist),
+        'brotli': brotli is not None,
+        'chunks': [{**c, 'modules': dict(sorted(c['modules'].items(), key=lambda m: -m[1]))}
+                   for c in sorted(chunks.values(), key=lambda c: c['file'])],
+        'routes': routes,
+        'duplicates': duplicates,
+        'over_budget': over,
+    }
+    if save:
+        os.makedirs(Path(output).parent, exist_ok=True)
+        tmp_path = str(output) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, output)
+        print(f"📄 Bundle report saved: {output}")
+
+    if over:
+        print(f"\n❌ {len(over)} route(s) over budget: {', '.join(over)}")
+        return False
+    print("\n✅ All routes within budget")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF production bundle budget check")
+    parser.add_argument("--dist", default=str(DIST_DIR), help="Vite build output directory")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--baseline", help="Saved report to compare with (default: the last run)")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run as the new baseline")
+    parser.add_argument("--output", default=str(OUTPUT_FILE), help="JSON output path")
+    args = parser.parse_args()
+
+    ok = analyze(dist=args.dist, top=args.top, baseline=args.baseline, save=not args.no_save, output=args.output)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
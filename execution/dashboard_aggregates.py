@@ -0,0 +1,473 @@
+"""
+Precomputed Dashboard aggregates.
+Maintains small summary documents with the totals Dashboard.jsx derives by
+scanning every batch, animal, expense, employee, crop and fruit:
+
+    dashboard/summary          active/sold counts per type, monthly payroll,
+                               monthly share of yearly expenses
+    dashboard/month_YYYY-MM    per-type revenue, expenses and bought cost,
+                               chart income/expense for that month
+    dashboard/all_time         the same totals over every month
+
+A period view (month, quarter, year) is the sum of its month documents.
+
+Usage:
+    python dashboard_aggregates.py update       # Apply changes since the last run
+    python dashboard_aggregates.py rebuild      # Recompute everything
+    python dashboard_aggregates.py check        # Compare with a brute-force recompute
+    python dashboard_aggregates.py update --qa  # qa_* collections -> qa_dashboard
+
+Incremental updates read only document ids and update times, then fetch
+the documents that changed. Each source document's contribution to the
+totals is kept in .tmp/dashboard_aggregates*.json, so an update subtracts
+the old contribution and adds the new one. Without that file (or if the
+aggregates were rebuilt elsewhere) the update falls back to a rebuild.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution.qa.test_data import get_firestore_client, collection_name, bulk_write
+
+STATE_DIR = Path(__file__).parent.parent / '.tmp'
+
+AGGREGATE_COLLECTION = 'dashboard'
+LIVESTOCK_TYPES = ['Goat', 'Sheep', 'Chicken', 'Cow']
+SOURCE_COLLECTIONS = ['batches', 'expenses', 'crops', 'fruits', 'employees', 'yearlyExpenses']
+TOLERANCE = 0.01
+
+
+def _num(value) -> float:
+    """JavaScript Number(value) || 0."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(number) else number
+
+
+def _month(value):
+    """YYYY-MM of a date string, or None (undated items never count)."""
+    if not isinstance(value, str) or len(value) < 7:
+        return None
+    return value[:7]
+
+
+def _add_month(totals, month, *key_value):
+    """Add to a month bucket and to the all-time bucket."""
+    *key, value = key_value
+    if month and value:
+        totals['|'.join(['month', month, *key])] += value
+        totals['|'.join(['month', 'all', *key])] += value
+
+
+# Contributions: flat Counter of 'kind|...|field' -> amount per source document
+
+def _batch_contribution(batch):
+    totals = Counter()
+    batch_type = batch.get('type')
+    for animal in batch.get('animals') or []:
+        status = animal.get('status')
+        if status not in ('Sold', 'Deceased'):
+            totals[f'count|{batch_type}|active'] += 1
+        if status == 'Sold':
+            totals[f'count|{batch_type}|sold'] += 1
+            sold_month = _month(animal.get('soldDate'))
+            sold_price = _num(animal.get('soldPrice'))
+            _add_month(totals, sold_month, batch_type, 'revenue', sold_price)
+            _add_month(totals, sold_month, 'chart', 'income', sold_price)
+        cost = _num(animal.get('purchaseCost')) or _num(animal.get('cost')) or _num(animal.get('boughtPrice'))
+        purchase_date = animal.get('boughtDate') or batch.get('startDate') or batch.get('date')
+        _add_month(totals, _month(purchase_date), batch_type, 'boughtCost', cost)
+    return totals
+
+
+def _expense_contribution(expense, batch_types):
+    totals = Counter()
+    month = _month(expense.get('date'))
+    amount = _num(expense.get('amount'))
+    batch_id, crop_id, fruit_id = expense.get('batchId'), expense.get('cropId'), expense.get('fruitId')
+    if batch_id and batch_types.get(batch_id):
+        _add_month(totals, month, batch_types[batch_id], 'expenses', amount)
+    if crop_id:
+        _add_month(totals, month, 'Vegetables', 'expenses', amount)
+    if fruit_id:
+        _add_month(totals, month, 'Fruits', 'expenses', amount)
+    if not batch_id and not crop_id and not fruit_id:
+        _add_month(totals, month, 'General', 'expenses', amount)
+    _add_month(totals, month, 'chart', 'expense', amount)
+    return totals
+
+
+def _planting_contribution(planting, planting_type):
+    totals = Counter()
+    status = planting.get('status')
+    if status == 'Growing':
+        totals[f'count|{planting_type}|active'] += 1
+    if status == 'Harvested':
+        totals[f'count|{planting_type}|sold'] += 1
+    _add_month(totals, _month(planting.get('plantedDate')), planting_type, 'boughtCost', _num(planting.get('seedCost')))
+    for sale in planting.get('sales') or []:
+        amount = _num(sale.get('amount'))
+        _add_month(totals, _month(sale.get('date')), planting_type, 'revenue', amount)
+        _add_month(totals, _month(sale.get('date')), 'chart', 'income', amount)
+    return totals
+
+
+def _employee_contribution(employee):
+    totals = Counter()
+    if employee.get('status') == 'Active':
+        totals['payroll|monthlySalaries'] += _num(employee.get('salary'))
+    return totals
+
+
+def _yearly_contribution(yearly):
+    # Math.round(amount / 12) rounds half up
+    monthly = _num(yearly.get('monthlyAmount')) or math.floor(_num(yearly.get('amount')) / 12 + 0.5)
+    return Counter({'yearly|monthly': monthly})
+
+
+def contribution(source, data, batch_types):
+    """Totals one source document adds to the aggregates."""
+    if source == 'batches':
+        totals = _batch_contribution(data)
+    elif source == 'expenses':
+        totals = _expense_contribution(data, batch_types)
+    elif source == 'crops':
+        totals = _planting_contribution(data, 'Vegetables')
+    elif source == 'fruits':
+        totals = _planting_contribution(data, 'Fruits')
+    elif source == 'employees':
+        totals = _employee_contribution(data)
+    else:
+        totals = _yearly_contribution(data)
+    return {key: value for key, value in totals.items() if value}
+
+
+# Aggregate documents <-> flat totals
+
+def _doc_id(month):
+    return 'all_time' if month == 'all' else f"month_{month}"
+
+
+def to_documents(totals: dict, months=None) -> dict:
+    """
+    Shape flat totals into aggregate documents.
+
+    months limits which month documents are produced (default: all present).
+    Returns {doc id: data}; the summary document is always included.
+    """
+    summary = {'counts': {}, 'payrollMonthly': 0.0, 'yearlyExpensesMonthly': 0.0}
+    documents = {}
+    for key, value in totals.items():
+        parts = key.split('|')
+        value = round(value, 2)
+        if parts[0] == 'count':
+            summary['counts'].setdefault(parts[1], {'active': 0, 'sold': 0})[parts[2]] = int(value)
+        elif parts[0] == 'payroll':
+            summary['payrollMonthly'] = value
+        elif parts[0] == 'yearly':
+            summary['yearlyExpensesMonthly'] = value
+        elif parts[0] == 'month' and (months is None or parts[1] in months):
+            doc = documents.setdefault(_doc_id(parts[1]), {'month': parts[1], 'types': {}, 'income': 0.0, 'expense': 0.0})
+            if parts[2] == 'chart':
+                doc[parts[3]] = value
+            else:
+                doc['types'].setdefault(parts[2], {})[parts[3]] = value
+    for month in months or []:
+        documents.setdefault(_doc_id(month), None)  # None: nothing left, delete
+    documents['summary'] = summary
+    return documents
+
+
+def from_documents(documents: dict) -> Counter:
+    """Flatten aggregate documents back into totals."""
+    totals = Counter()
+    for doc_id, doc in documents.items():
+        if not doc:
+            continue
+        if doc_id == 'summary':
+            for type_name, counts in doc.get('counts', {}).items():
+                for field, value in counts.items():
+                    totals[f'count|{type_name}|{field}'] += value
+            totals['payroll|monthlySalaries'] += doc.get('payrollMonthly', 0)
+            totals['yearly|monthly'] += doc.get('yearlyExpensesMonthly', 0)
+            continue
+        month = doc.get('month')
+        for type_name, fields in doc.get('types', {}).items():
+            for field, value in fields.items():
+                totals[f'month|{month}|{type_name}|{field}'] += value
+        totals[f'month|{month}|chart|income'] += doc.get('income', 0)
+        totals[f'month|{month}|chart|expense'] += doc.get('expense', 0)
+    return Counter({k: v for k, v in totals.items() if v})
+
+
+# Local ledger of per-document contributions
+
+def _state_path(qa):
+    return STATE_DIR / f"dashboard_aggregates{'_qa' if qa else ''}.json"
+
+
+def _load_state(qa):
+    try:
+        with open(_state_path(qa)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(qa, state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = _state_path(qa)
+    tmp_path = str(path) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _update_time(snapshot):
+    return str(getattr(snapshot, 'update_time', '') or '')
+
+
+def _write(db, qa, documents, token):
+    coll = db.collection(collection_name(AGGREGATE_COLLECTION, qa))
+    documents['summary'].update({'checkpoint': token, 'updated': datetime.now().isoformat()})
+    operations = [('delete', coll.document(doc_id), None) if data is None else ('set', coll.document(doc_id), data)
+                  for doc_id, data in documents.items()]
+    return bulk_write(db, operations)
+
+
+def rebuild(qa=False):
+    """Recompute every aggregate document from the source collections."""
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    print(f"[AGGREGATES] Rebuilding{' (qa_*)' if qa else ''}...")
+    snapshots = {source: list(db.collection(collection_name(source, qa)).stream()) for source in SOURCE_COLLECTIONS}
+    batch_types = {s.id: (s.to_dict() or {}).get('type') for s in snapshots['batches']}
+
+    ledger = {}
+    totals = Counter()
+    for source, docs in snapshots.items():
+        for snapshot in docs:
+            data = snapshot.to_dict() or {}
+            part = contribution(source, data, batch_types)
+            totals.update(part)
+            entry = {'updated': _update_time(snapshot), 'totals': part}
+            if source == 'expenses':
+                entry['batchId'] = data.get('batchId')
+                entry['batchType'] = batch_types.get(data.get('batchId'))
+            ledger[f"{source}/{snapshot.id}"] = entry
+        print(f"  {collection_name(source, qa)}: {len(docs)} documents")
+
+    # Drop month documents that no longer have any totals
+    coll = db.collection(collection_name(AGGREGATE_COLLECTION, qa))
+    documents = to_documents(totals)
+    for snapshot in coll.select([]).stream():
+        documents.setdefault(snapshot.id, None)
+
+    token = uuid.uuid4().hex
+    written = _write(db, qa, documents, token)
+    _save_state(qa, {'checkpoint': token, 'ledger': ledger, 'batchTypes': batch_types})
+    print(f"[AGGREGATES] Rebuilt {written} aggregate documents")
+    return True
+
+
+def update(qa=False):
+    """
+    Apply changes since the last run.
+
+    Reads ids and update times of every source document (no field data),
+    fetches only documents that are new, changed or whose linked batch
+    changed type, and rewrites only the month documents they touch.
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    coll = db.collection(collection_name(AGGREGATE_COLLECTION, qa))
+    state = _load_state(qa)
+    summary = coll.document('summary').get()
+    stored_token = (summary.to_dict() or {}).get('checkpoint') if summary.exists else None
+    if not state or state.get('checkpoint') != stored_token:
+        print("[AGGREGATES] No matching checkpoint, rebuilding")
+        return rebuild(qa)
+
+    ledger = state['ledger']
+    seen = {}
+    batch_types = {}
+    for source in SOURCE_COLLECTIONS:
+        fields = ['type'] if source == 'batches' else []
+        for snapshot in db.collection(collection_name(source, qa)).select(fields).stream():
+            seen[f"{source}/{snapshot.id}"] = (snapshot.reference, _update_time(snapshot))
+            if source == 'batches':
+                batch_types[snapshot.id] = (snapshot.to_dict() or {}).get('type')
+
+    changed = [path for path, (_, updated) in seen.items()
+               if path not in ledger or ledger[path]['updated'] != updated]
+    removed = [path for path in ledger if path not in seen]
+    # Expenses follow their batch's type
+    changed += [path for path, entry in ledger.items()
+                if path.startswith('expenses/') and path in seen and path not in changed
+                and entry.get('batchType') != batch_types.get(entry.get('batchId'))]
+
+    if not changed and not removed:
+        print("[AGGREGATES] Up to date")
+        return True
+
+    delta = Counter()
+    for path in removed:
+        delta.subtract(ledger.pop(path)['totals'])
+
+    refs = [seen[path][0] for path in changed]
+    for start in range(0, len(refs), 300):
+        for snapshot in db.get_all(refs[start:start + 300]):
+            if not snapshot.exists:
+                continue
+            source = snapshot.reference.path.split('/')[-2].removeprefix('qa_')
+            path = f"{source}/{snapshot.id}"
+            data = snapshot.to_dict() or {}
+            part = contribution(source, data, batch_types)
+            delta.subtract(ledger.get(path, {}).get('totals', {}))
+            delta.update(part)
+            entry = {'updated': _update_time(snapshot), 'totals': part}
+            if source == 'expenses':
+                entry['batchId'] = data.get('batchId')
+                entry['batchType'] = batch_types.get(data.get('batchId'))
+            ledger[path] = entry
+
+    delta = {key: value for key, value in delta.items() if abs(value) > 1e-9}
+    months = {key.split('|')[1] for key in delta if key.startswith('month|')}
+    current = {doc_id: None for doc_id in [_doc_id(m) for m in months] + ['summary']}
+    for snapshot in db.get_all([coll.document(doc_id) for doc_id in current]):
+        if snapshot.exists:
+            current[snapshot.id] = snapshot.to_dict()
+
+    totals = from_documents(current)
+    totals.update(delta)
+    totals = {key: value for key, value in totals.items() if abs(value) > 1e-6}
+
+    token = uuid.uuid4().hex
+    written = _write(db, qa, to_documents(totals, months), token)
+    _save_state(qa, {'checkpoint': token, 'ledger': ledger, 'batchTypes': batch_types})
+    print(f"[AGGREGATES] {len(changed)} changed, {len(removed)} removed -> {written} aggregate documents written")
+    return True
+
+
+def brute_force(data: dict) -> Counter:
+    """
+    Recompute the totals the way Dashboard.jsx does, straight from the
+    source documents (filter by type, then scan), month by month.
+    """
+    totals = Counter()
+    batches, expenses = data['batches'], data['expenses']
+    months = set()
+    for batch in batches:
+        months.add(_month(batch.get('startDate') or batch.get('date')))
+        for animal in batch.get('animals') or []:
+            months.update([_month(animal.get('soldDate')), _month(animal.get('boughtDate'))])
+    for item in expenses + data['crops'] + data['fruits']:
+        months.update([_month(item.get('date')), _month(item.get('plantedDate'))])
+        months.update(_month(s.get('date')) for s in item.get('sales') or [])
+    months.discard(None)
+
+    types = sorted({b.get('type') for b in batches} | set(LIVESTOCK_TYPES), key=str)
+    for batch_type in types:
+        type_batches = [b for b in batches if b.get('type') == batch_type]
+        animals = [(b, a) for b in type_batches for a in b.get('animals') or []]
+        totals[f'count|{batch_type}|active'] = sum(1 for _, a in animals if a.get('status') not in ('Sold', 'Deceased'))
+        totals[f'count|{batch_type}|sold'] = sum(1 for _, a in animals if a.get('status') == 'Sold')
+        batch_ids = [b['id'] for b in type_batches]
+        for month in months:
+            for bucket in (month, 'all'):
+                in_period = (lambda d: _month(d) == month)
+                totals[f'month|{bucket}|{batch_type}|boughtCost'] += sum(
+                    _num(a.get('purchaseCost')) or _num(a.get('cost')) or _num(a.get('boughtPrice'))
+                    for b, a in animals if in_period(a.get('boughtDate') or b.get('startDate') or b.get('date')))
+                totals[f'month|{bucket}|{batch_type}|revenue'] += sum(
+                    _num(a.get('soldPrice')) for _, a in animals if a.get('status') == 'Sold' and in_period(a.get('soldDate')))
+                totals[f'month|{bucket}|{batch_type}|expenses'] += sum(
+                    _num(e.get('amount')) for e in expenses if e.get('batchId') in batch_ids and in_period(e.get('date')))
+
+    for planting_type, plantings, link in (('Vegetables', data['crops'], 'cropId'), ('Fruits', data['fruits'], 'fruitId')):
+        totals[f'count|{planting_type}|active'] = sum(1 for p in plantings if p.get('status') == 'Growing')
+        totals[f'count|{planting_type}|sold'] = sum(1 for p in plantings if p.get('status') == 'Harvested')
+        for month in months:
+            for bucket in (month, 'all'):
+                totals[f'month|{bucket}|{planting_type}|boughtCost'] += sum(
+                    _num(p.get('seedCost')) for p in plantings if _month(p.get('plantedDate')) == month)
+                totals[f'month|{bucket}|{planting_type}|revenue'] += sum(
+                    _num(s.get('amount')) for p in plantings for s in p.get('sales') or [] if _month(s.get('date')) == month)
+                totals[f'month|{bucket}|{planting_type}|expenses'] += sum(
+                    _num(e.get('amount')) for e in expenses if e.get(link) and _month(e.get('date')) == month)
+
+    for month in months:
+        for bucket in (month, 'all'):
+            totals[f'month|{bucket}|General|expenses'] += sum(
+                _num(e.get('amount')) for e in expenses
+                if not e.get('batchId') and not e.get('cropId') and not e.get('fruitId') and _month(e.get('date')) == month)
+            totals[f'month|{bucket}|chart|income'] += sum(
+                _num(a.get('soldPrice')) for b in batches for a in b.get('animals') or []
+                if a.get('status') == 'Sold' and _month(a.get('soldDate')) == month)
+            totals[f'month|{bucket}|chart|income'] += sum(
+                _num(s.get('amount')) for p in data['crops'] + data['fruits'] for s in p.get('sales') or []
+                if _month(s.get('date')) == month)
+            totals[f'month|{bucket}|chart|expense'] += sum(
+                _num(e.get('amount')) for e in expenses if _month(e.get('date')) == month)
+
+    totals['payroll|monthlySalaries'] = sum(_num(e.get('salary')) for e in data['employees'] if e.get('status') == 'Active')
+    totals['yearly|monthly'] = sum(_num(e.get('monthlyAmount')) or math.floor(_num(e.get('amount')) / 12 + 0.5)
+                                   for e in data['yearlyExpenses'])
+    return Counter({k: v for k, v in totals.items() if v})
+
+
+def check(qa=False):
+    """Compare the stored aggregates with a brute-force recompute."""
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    data = {source: [{**(s.to_dict() or {}), 'id': s.id} for s in db.collection(collection_name(source, qa)).stream()]
+            for source in SOURCE_COLLECTIONS}
+    expected = brute_force(data)
+    coll = db.collection(collection_name(AGGREGATE_COLLECTION, qa))
+    stored = from_documents({s.id: s.to_dict() for s in coll.stream()})
+
+    differences = [(key, stored.get(key, 0), expected.get(key, 0))
+                   for key in sorted(set(stored) | set(expected))
+                   if abs(stored.get(key, 0) - expected.get(key, 0)) > TOLERANCE]
+    for key, got, want in differences[:30]:
+        print(f"  ❌ {key}: stored {got:.2f}, expected {want:.2f}")
+    if len(differences) > 30:
+        print(f"  ... {len(differences) - 30} more")
+
+    if differences:
+        print(f"[AGGREGATES] {len(differences)} value(s) differ. Run: python dashboard_aggregates.py rebuild")
+        return False
+    print(f"[AGGREGATES] ✅ {len(expected)} values match the brute-force recompute")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF Dashboard aggregates")
+    parser.add_argument("command", choices=["update", "rebuild", "check"])
+    parser.add_argument("--qa", action="store_true", help="Use qa_* collections")
+    args = parser.parse_args()
+
+    commands = {'update': update, 'rebuild': rebuild, 'check': check}
+    return 0 if commands[args.command](qa=args.qa) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Document size and growth audit.
+Streams each app collection, computes the Firestore storage size of every
+document and of its embedded arrays, estimates how fast each document grows
+from the dates on array elements and projects when it reaches the 1 MiB
+document limit.
+
+Usage:
+    python doc_size_audit.py                    # Audit production collections
+    python doc_size_audit.py --qa               # Audit qa_* collections
+    python doc_size_audit.py --top 20           # Show more offenders
+    python doc_size_audit.py --window 30        # Growth rate over the last 30 days
+
+Sizes follow https://firebase.google.com/docs/firestore/storage-size:
+strings are UTF-8 bytes + 1, numbers/timestamps 8, booleans/null 1,
+maps and arrays the sum of their contents, plus 32 bytes per document.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution.qa.test_data import get_firestore_client, collection_name, APP_COLLECTIONS
+
+OUTPUT_FILE = Path(__file__).parent.parent / '.tmp' / 'doc_size_audit.json'
+
+MAX_DOC_SIZE = 1024 * 1024  # Firestore hard limit per document
+WARN_RATIO = 0.5            # flag documents above this share of the limit
+HORIZON_DAYS = 365          # flag documents projected to hit the limit within this
+GROWTH_WINDOW_DAYS = 90     # trailing window for the growth rate
+
+# Fields checked (in order) for the date an array element was added
+ELEMENT_DATE_FIELDS = ('createdAt', 'date', 'entryDate', 'plantedDate')
+
+
+def value_size(value) -> int:
+    """Storage size of a Firestore field value in bytes."""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime, date)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(k.encode('utf-8')) + 1 + value_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(v) for v in value)
+    if hasattr(value, 'latitude') and hasattr(value, 'longitude'):
+        return 16  # GeoPoint
+    if hasattr(value, 'path'):
+        return document_name_size(value.path)  # DocumentReference
+    return len(str(value).encode('utf-8')) + 1
+
+
+def document_name_size(path: str) -> int:
+    """Size of a document name: each path segment + 1, plus 16."""
+    return sum(len(segment.encode('utf-8')) + 1 for segment in path.split('/')) + 16
+
+
+def document_size(path: str, data: dict) -> int:
+    """Storage size of a whole document."""
+    return document_name_size(path) + value_size(data) + 32
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _element_date(element):
+    for field in ELEMENT_DATE_FIELDS:
+        if field in element:
+            parsed = _parse_date(element[field])
+            if parsed:
+                return parsed
+    return None
+
+
+def _walk_arrays(value, prefix, arrays, events):
+    """
+    Collect array stats under value.
+
+    arrays: array path ('animals.weightHistory') -> [elements, bytes]
+    events: (date, bytes) per dated array element. Nested arrays of maps
+            are attributed to their own elements, not to the parent.
+    """
+    for key, field in value.items():
+        if not isinstance(field, list):
+            continue
+        path = f"{prefix}{key}"
+        stats = arrays.setdefault(path, [0, 0])
+        stats[0] += len(field)
+        stats[1] += value_size(field)
+        for element in field:
+            if not isinstance(element, dict):
+                continue
+            own = {k: v for k, v in element.items()
+                   if not (isinstance(v, list) and any(isinstance(i, dict) for i in v))}
+            added = _element_date(element)
+            if added:
+                events.append((added, value_size(own)))
+            _walk_arrays(element, f"{path}.", arrays, events)
+
+
+def audit_document(path: str, data: dict, today: date, window: int = GROWTH_WINDOW_DAYS) -> dict:
+    """
+    Size, array stats, growth rate and 1 MiB projection for one document.
+
+    The growth rate is the bytes of array elements dated within the trailing
+    window divided by the window length. Documents with no recent elements
+    fall back to their lifetime rate (all dated elements since the oldest).
+    """
+    if window < 1:
+        raise ValueError(f"Growth window must be at least 1 day, got {window}")
+    size = document_size(path, data)
+    arrays = {}
+    events = []
+    _walk_arrays(data, '', arrays, events)
+
+    since = today - timedelta(days=window)
+    recent = sum(b for d, b in events if since < d <= today)
+    rate = recent / window
+    if not rate and events:
+        oldest = min(_parse_date(data.get('createdAt')) or today, min(d for d, _ in events))
+        age = max((today - oldest).days, 1)
+        rate = sum(b for _, b in events) / age
+
+    days_to_limit = None
+    if size >= MAX_DOC_SIZE:
+        days_to_limit = 0
+    elif rate > 0:
+        days_to_limit = int((MAX_DOC_SIZE - size) / rate)
+
+    return {
+        'path': path,
+        'size': size,
+        'percent_of_limit': round(size / MAX_DOC_SIZE * 100, 2),
+        'arrays': {name: {'elements': n, 'bytes': b} for name, (n, b) in sorted(arrays.items())},
+        'growth_bytes_per_day': round(rate, 1),
+        'days_to_limit': days_to_limit,
+        'projected_limit_date': (today + timedelta(days=days_to_limit)).isoformat()
+                                if days_to_limit is not None and days_to_limit < 365 * 100 else None,
+    }
+
+
+def _flagged(doc: dict) -> bool:
+    return (doc['size'] >= MAX_DOC_SIZE * WARN_RATIO
+            or (doc['days_to_limit'] is not None and doc['days_to_limit'] <= HORIZON_DAYS))
+
+
+def audit(qa=False, top=10, window=GROWTH_WINDOW_DAYS, output=OUTPUT_FILE):
+    """Audit all app collections, print the worst offenders and save JSON."""
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    today = date.today()
+    collections = {}
+    documents = []
+
+    print(f"[AUDIT] Auditing document sizes{' (qa_*)' if qa else ''}...")
+    for base_name in APP_COLLECTIONS:
+        name = collection_name(base_name, qa)
+        sizes = []
+        for doc in db.collection(name).stream():
+            result = audit_document(f"{name}/{doc.id}", doc.to_dict() or {}, today, window)
+            documents.append(result)
+            sizes.append(result['size'])
+        if not sizes:
+            continue
+        sizes.sort()
+        collections[name] = {
+            'documents': len(sizes),
+            'total_bytes': sum(sizes),
+            'median_bytes': sizes[(len(sizes) - 1) // 2],
+            'max_bytes': sizes[-1],
+        }
+        print(f"  {name:<18} {len(sizes):>6} docs  median {sizes[(len(sizes) - 1) // 2]:>9,} B  max {sizes[-1]:>10,} B")
+
+    # Soonest projected limit first, then largest
+    documents.sort(key=lambda d: (d['days_to_limit'] if d['days_to_limit'] is not None else float('inf'), -d['size']))
+    flagged = [d for d in documents if _flagged(d)]
+
+    print(f"\nWorst offenders (growth over the last {window} days)")
+    for doc in documents[:top]:
+        mark = '⚠️' if _flagged(doc) else '  '
+        when = doc['projected_limit_date'] or 'never'
+        biggest = max(doc['arrays'].items(), key=lambda a: a[1]['elements'], default=None)
+        detail = f"{biggest[0]}[{biggest[1]['elements']}]" if biggest else '-'
+        print(f" {mark} {doc['path']:<36} {doc['size']:>10,} B ({doc['percent_of_limit']:>5.1f}%)"
+              f"  +{doc['growth_bytes_per_day']:>8,.0f} B/day  1 MiB: {when:<10}  {detail}")
+
+    if flagged:
+        print(f"\n⚠️ {len(flagged)} document(s) above {int(WARN_RATIO * 100)}% of the limit "
+              f"or projected to reach it within {HORIZON_DAYS} days")
+    else:
+        print("\n✅ No documents near the 1 MiB limit")
+
+    os.makedirs(Path(output).parent, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'generated': datetime.now().isoformat(),
+            'qa': qa,
+            'limit_bytes': MAX_DOC_SIZE,
+            'window_days': window,
+            'collections': collections,
+            'flagged': [d['path'] for d in flagged],
+            'documents': documents,
+        }, f, indent=2)
+    print(f"📄 Audit saved: {output}")
+    return True
+
+
+def parse_window(value: str) -> int:
+    """Parse the growth window in days (at least 1)."""
+    try:
+        window = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"window must be a number of days, got {value!r}")
+    if window < 1:
+        raise argparse.ArgumentTypeError("window must be at least 1 day")
+    return window
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF Firestore document size audit")
+    parser.add_argument("--qa", action="store_true", help="Audit qa_* collections")
+    parser.add_argument("--top", type=int, default=10, help="Number of documents to list")
+    parser.add_argument("--window", type=parse_window, default=GROWTH_WINDOW_DAYS, help="Growth rate window in days")
+    parser.add_argument("--output", default=str(OUTPUT_FILE), help="JSON output path")
+    args = parser.parse_args()
+
+    return 0 if audit(qa=args.qa, top=args.top, window=args.window, output=args.output) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+"""
+Columnar export and analytics over farm data.
+Streams Firestore collections into NumPy column files and computes
+reporting metrics with vectorized operations instead of browser loops.
+
+Usage:
+    python farm_analytics.py export          # Incremental export (new docs by createdAt)
+    python farm_analytics.py export --full   # Re-export everything
+    python farm_analytics.py report          # Metrics from the exported columns
+    python farm_analytics.py export --qa     # Use qa_* collections
+
+Tables (one .npz per table in .tmp/analytics/):
+    batches, animals, weights       <- batches (animals[] and weightHistory[] flattened)
+    expenses                        <- expenses
+    payments                        <- employees.payments[]
+    crops, crop_sales               <- crops (sales[] flattened)
+    fruits, fruit_sales             <- fruits (sales[] flattened)
+
+Incremental export only picks up documents whose createdAt is newer than
+the last export. Edits to existing documents (new animals, weights or
+payments added to an old batch/employee) need an export --full.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from execution.qa.test_data import get_firestore_client, collection_name
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+OUTPUT_DIR = Path(__file__).parent.parent / '.tmp' / 'analytics'
+
+# Column kinds: 'str' -> unicode array, 'num' -> float64 (NaN if missing),
+# 'date' -> datetime64[D] (NaT if missing)
+TABLES = {
+    'batches': ('batches', 'batchId', {
+        'batchId': 'str', 'name': 'str', 'type': 'str', 'status': 'str', 'date': 'date', 'createdAt': 'str',
+    }),
+    'animals': ('batches', 'batchId', {
+        'batchId': 'str', 'batchType': 'str', 'animalId': 'str', 'gender': 'str', 'status': 'str',
+        'entryDate': 'date', 'weight': 'num', 'purchaseCost': 'num', 'soldPrice': 'num', 'soldDate': 'date',
+    }),
+    'weights': ('batches', 'batchId', {
+        'batchId': 'str', 'batchType': 'str', 'animalId': 'str', 'date': 'date', 'weight': 'num',
+    }),
+    'expenses': ('expenses', 'expenseId', {
+        'expenseId': 'str', 'category': 'str', 'amount': 'num', 'date': 'date',
+        'batchId': 'str', 'cropId': 'str', 'fruitId': 'str', 'createdAt': 'str',
+    }),
+    'payments': ('employees', 'employeeId', {
+        'employeeId': 'str', 'paymentId': 'str', 'type': 'str', 'amount': 'num', 'month': 'str',
+        'date': 'date', 'createdAt': 'str',
+    }),
+    'crops': ('crops', 'cropId', {
+        'cropId': 'str', 'name': 'str', 'status': 'str', 'plantedDate': 'date', 'seedCost': 'num',
+    }),
+    'crop_sales': ('crops', 'cropId', {
+        'cropId': 'str', 'saleId': 'str', 'date': 'date', 'quantity': 'num', 'amount': 'num',
+    }),
+    'fruits': ('fruits', 'fruitId', {
+        'fruitId': 'str', 'name': 'str', 'status': 'str', 'plantedDate': 'date', 'seedCost': 'num',
+    }),
+    'fruit_sales': ('fruits', 'fruitId', {
+        'fruitId': 'str', 'saleId': 'str', 'date': 'date', 'quantity': 'num', 'amount': 'num',
+    }),
+}
+
+
+def _flatten_batch(doc_id, batch):
+    yield 'batches', {**batch, 'batchId': doc_id}
+    for animal in batch.get('animals') or []:
+        row = {**animal, 'batchId': doc_id, 'batchType': batch.get('type'), 'animalId': animal.get('id')}
+        row['purchaseCost'] = animal.get('purchaseCost') or animal.get('cost') or animal.get('boughtPrice')
+        yield 'animals', row
+        for record in animal.get('weightHistory') or []:
+            yield 'weights', {**record, 'batchId': doc_id, 'batchType': batch.get('type'), 'animalId': animal.get('id')}
+
+
+def _flatten_expense(doc_id, expense):
+    yield 'expenses', {**expense, 'expenseId': doc_id}
+
+
+def _flatten_employee(doc_id, employee):
+    for payment in employee.get('payments') or []:
+        yield 'payments', {**payment, 'employeeId': doc_id, 'paymentId': payment.get('id')}
+
+
+def _flatten_planting(table, sales_table, key):
+    def _flatten(doc_id, planting):
+        yield table, {**planting, key: doc_id}
+        for sale in planting.get('sales') or []:
+            yield sales_table, {**sale, key: doc_id, 'saleId': sale.get('id')}
+    return _flatten
+
+
+SOURCES = {
+    'batches': _flatten_batch,
+    'expenses': _flatten_expense,
+    'employees': _flatten_employee,
+    'crops': _flatten_planting('crops', 'crop_sales', 'cropId'),
+    'fruits': _flatten_planting('fruits', 'fruit_sales', 'fruitId'),
+}
+
+
+def _cell(kind, value):
+    if kind == 'num':
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+    if kind == 'date':
+        text = str(value or '')[:10]
+        try:
+            datetime.strptime(text, '%Y-%m-%d')
+            return text
+        except ValueError:
+            return 'NaT'
+    return '' if value is None else str(value)
+
+
+def _to_arrays(table, rows):
+    columns = TABLES[table][2]
+    arrays = {}
+    for name, kind in columns.items():
+        values = [_cell(kind, row.get(name)) for row in rows]
+        if kind == 'num':
+            arrays[name] = np.array(values, dtype='float64')
+        elif kind == 'date':
+            arrays[name] = np.array(values, dtype='datetime64[D]')
+        else:
+            arrays[name] = np.array(values, dtype='U')
+    return arrays
+
+
+def load_table(table, output_dir=OUTPUT_DIR):
+    """Load a table as a dict of column arrays (empty columns if missing)."""
+    path = Path(output_dir) / f"{table}.npz"
+    if path.exists():
+        with np.load(path, allow_pickle=False) as npz:
+            return {name: npz[name] for name in npz.files}
+    return _to_arrays(table, [])
+
+
+def _save_table(table, arrays, output_dir):
+    path = Path(output_dir) / f"{table}.npz"
+    part_path = path.with_suffix('.part.npz')
+    np.savez_compressed(part_path, **arrays)
+    os.replace(part_path, path)
+
+
+def export(qa=False, full=False, output_dir=OUTPUT_DIR):
+    """
+    Stream source collections into columnar .npz tables.
+
+    Incremental runs query createdAt > last export per source collection
+    and replace the rows belonging to the returned documents.
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = Path(output_dir) / 'manifest.json'
+    manifest = {}
+    if manifest_path.exists() and not full:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    if manifest.get('qa', qa) != qa:
+        print("[ANALYTICS] Export dir holds the other dataset, doing a full export")
+        manifest = {}
+        full = True
+    checkpoints = manifest.get('checkpoints', {})
+    full = full or not checkpoints
+
+    print(f"[ANALYTICS] {'Full' if full else 'Incremental'} export{' (qa_*)' if qa else ''}...")
+    for source, flatten in SOURCES.items():
+        query = db.collection(collection_name(source, qa))
+        last = checkpoints.get(source)
+        if last and not full:
+            query = query.where('createdAt', '>', last)
+
+        rows = {table: [] for table, (src, _, _) in TABLES.items() if src == source}
+        doc_ids = []
+        newest = last
+        for doc in query.stream():
+            data = doc.to_dict()
+            doc_ids.append(doc.id)
+            created = data.get('createdAt')
+            if isinstance(created, str) and (newest is None or created > newest):
+                newest = created
+            for table, row in flatten(doc.id, data):
+                rows[table].append(row)
+
+        for table, table_rows in rows.items():
+            fresh = _to_arrays(table, table_rows)
+            if not full and last:
+                existing = load_table(table, output_dir)
+                key = TABLES[table][1]
+                keep = ~np.isin(existing[key], np.array(doc_ids, dtype='U'))
+                fresh = {name: np.concatenate([existing[name][keep], fresh[name]]) for name in fresh}
+            _save_table(table, fresh, output_dir)
+
+        if newest:
+            checkpoints[source] = newest
+        print(f"  {collection_name(source, qa)}: {len(doc_ids)} documents"
+              f" -> {', '.join(f'{t} +{len(r)}' for t, r in rows.items())}")
+
+    manifest = {'qa': qa, 'checkpoints': checkpoints, 'exported': datetime.now().isoformat()}
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\n[ANALYTICS] Export complete: {output_dir}")
+    return True
+
+
+def _group_sum(keys, values):
+    """Sum values per unique key. Returns (unique keys, sums, counts)."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique))
+    counts = np.bincount(inverse, minlength=len(unique))
+    return unique, sums, counts
+
+
+def average_daily_gain(weights):
+    """
+    Average daily weight gain (kg/day) per batch type.
+
+    Per animal: (last weight - first weight) / days between the first and
+    last weight record. Animals with a single record are skipped.
+    """
+    valid = ~np.isnat(weights['date']) & ~np.isnan(weights['weight'])
+    animal = np.char.add(np.char.add(weights['batchId'][valid], '/'), weights['animalId'][valid])
+    dates = weights['date'][valid]
+    weight = weights['weight'][valid]
+    types = weights['batchType'][valid]
+    if not len(animal):
+        return {}
+
+    order = np.lexsort((dates, animal))
+    animal, dates, weight, types = animal[order], dates[order], weight[order], types[order]
+    _, first = np.unique(animal, return_index=True)
+    last = np.append(first[1:] - 1, len(animal) - 1)
+
+    days = (dates[last] - dates[first]).astype('int64')
+    grows = days > 0
+    gain = (weight[last] - weight[first])[grows] / days[grows]
+    unique, sums, counts = _group_sum(types[first][grows], gain)
+    return {t: {'adg_kg_per_day': round(float(s / c), 4), 'animals': int(c)}
+            for t, s, c in zip(unique, sums, counts)}
+
+
+def cost_per_kg(batches, animals, expenses):
+    """
+    Cost per kg of live weight per batch.
+
+    Cost = animal purchase costs + expenses linked by batchId. Weight is
+    the current weight of animals that are not sold or deceased.
+    """
+    batch_ids = np.unique(batches['batchId'])
+    if not len(batch_ids):
+        return {}
+
+    def _per_batch(ids, values):
+        idx = np.searchsorted(batch_ids, ids)
+        idx = np.clip(idx, 0, len(batch_ids) - 1)
+        known = batch_ids[idx] == ids
+        return np.bincount(idx[known], weights=np.nan_to_num(values[known]), minlength=len(batch_ids))
+
+    purchase = _per_batch(animals['batchId'], animals['purchaseCost'])
+    linked = _per_batch(expenses['batchId'], expenses['amount'])
+    live = ~np.isin(animals['status'], ['Sold', 'Deceased'])
+    live_kg = _per_batch(animals['batchId'][live], animals['weight'][live])
+
+    total_cost = purchase + linked
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_kg = np.where(live_kg > 0, total_cost / live_kg, np.nan)
+
+    types = dict(zip(batches['batchId'], batches['type']))
+    return {
+        b: {
+            'type': types.get(b, ''),
+            'cost': round(float(c), 2),
+            'live_kg': round(float(kg), 3),
+            'cost_per_kg': None if np.isnan(p) else round(float(p), 2),
+        }
+        for b, c, kg, p in zip(batch_ids, total_cost, live_kg, per_kg)
+    }
+
+
+def expenses_by_month(expenses, payments):
+    """Expense totals per month and category (payroll included as 'Payroll')."""
+    months = np.concatenate([expenses['date'], payments['date']]).astype('datetime64[M]')
+    categories = np.concatenate([expenses['category'], np.full(len(payments['date']), 'Payroll')])
+    amounts = np.nan_to_num(np.concatenate([expenses['amount'], payments['amount']]))
+    valid = ~np.isnat(months)
+    months, categories, amounts = months[valid], categories[valid], amounts[valid]
+    if not len(months):
+        return {}
+
+    month_keys, month_idx = np.unique(months, return_inverse=True)
+    cat_keys, cat_idx = np.unique(categories, return_inverse=True)
+    grid = np.bincount(month_idx * len(cat_keys) + cat_idx, weights=amounts,
+                       minlength=len(month_keys) * len(cat_keys)).reshape(len(month_keys), len(cat_keys))
+
+    return {
+        str(m): {'total': round(float(row.sum()), 2),
+                 **{str(c): round(float(v), 2) for c, v in zip(cat_keys, row) if v}}
+        for m, row in zip(month_keys, grid)
+    }
+
+
+def report(output_dir=OUTPUT_DIR):
+    """Compute metrics from exported tables, print them and save JSON."""
+    if not (Path(output_dir) / 'manifest.json').exists():
+        print(f"[ERROR] No export found in {output_dir}. Run: python farm_analytics.py export")
+        return False
+
+    batches = load_table('batches', output_dir)
+    animals = load_table('animals', output_dir)
+    weights = load_table('weights', output_dir)
+    expenses = load_table('expenses', output_dir)
+    payments = load_table('payments', output_dir)
+
+    results = {
+        'generated': datetime.now().isoformat(),
+        'average_daily_gain_by_type': average_daily_gain(weights),
+        'cost_per_kg_by_batch': cost_per_kg(batches, animals, expenses),
+        'expenses_by_month': expenses_by_month(expenses, payments),
+    }
+
+    print("\nAverage daily gain by batch type")
+    for batch_type, row in sorted(results['average_daily_gain_by_type'].items()):
+        print(f"  {batch_type:<10} {row['adg_kg_per_day']:>8.3f} kg/day  ({row['animals']} animals)")
+
+    print("\nCost per kg by batch")
+    for batch_id, row in sorted(results['cost_per_kg_by_batch'].items()):
+        per_kg = f"{row['cost_per_kg']:.2f}" if row['cost_per_kg'] is not None else "-"
+        print(f"  {batch_id:<14} {row['type']:<8} cost {row['cost']:>12.2f}  live {row['live_kg']:>9.1f} kg  {per_kg:>9}/kg")
+
+    print("\nExpenses by month")
+    for month, row in sorted(results['expenses_by_month'].items()):
+        parts = ', '.join(f"{k} {v:.0f}" for k, v in row.items() if k != 'total')
+        print(f"  {month}  {row['total']:>12.2f}  ({parts})")
+
+    report_path = Path(output_dir) / 'report.json'
+    with open(report_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Report saved: {report_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF columnar export and analytics")
+    parser.add_argument("command", choices=["export", "report"])
+    parser.add_argument("--full", action="store_true", help="Re-export everything instead of new documents only")
+    parser.add_argument("--qa", action="store_true", help="Use qa_* collections")
+    parser.add_argument("--output", default=str(OUTPUT_DIR), help="Directory for column files")
+    args = parser.parse_args()
+
+    if np is None:
+        print("[ERROR] numpy not installed. Run: pip install numpy")
+        return 1
+
+    if args.command == "export":
+        return 0 if export(qa=args.qa, full=args.full, output_dir=args.output) else 1
+    return 0 if report(output_dir=args.output) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
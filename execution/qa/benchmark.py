@@ -0,0 +1,235 @@
+"""
+Data-volume scaling benchmark for app pages.
+Seeds qa_* collections at increasing farm sizes (test_data.seed_scale_data),
+measures page load, first render, a filter interaction and modal open
+latency for each page, then fits latency = a + b * n^k to estimate how each
+metric scales with the number of animals.
+
+Used by `qa_runner.py --benchmark`.
+"""
+
+import json
+import os
+import statistics
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+# Page -> how to measure it. interaction is ('click', button text) or
+# ('select', label text, option index); modal is the text of the button
+# that opens it.
+BENCH_PAGES = {
+    "dashboard": {"path": "/", "interaction": ("click", "All Time"), "modal": None},
+    "livestock": {"path": "/livestock", "interaction": ("click", "Sold Animals"), "modal": "New Batch"},
+    "expenses": {"path": "/expenses", "interaction": ("select", "Filter by Source", 1), "modal": "Add Expense"},
+}
+
+SETTLE_MS = 500        # no DOM content changes for this long = page settled
+LOAD_TIMEOUT_MS = 60000
+
+# Resolves with page timings once the DOM content has been quiet for
+# SETTLE_MS: last content mutation (data rendered) and first contentful paint,
+# both relative to navigation start.
+_SETTLE_SCRIPT = """
+var settle = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var last = performance.now();
+var observer = new MutationObserver(function () { last = performance.now(); });
+observer.observe(document.body, { childList: true, subtree: true, characterData: true });
+(function check() {
+    var now = performance.now();
+    var root = document.getElementById('root');
+    var mounted = root && root.children.length > 0;
+    if ((mounted && now - last >= settle) || now > timeout) {
+        observer.disconnect();
+        var paint = performance.getEntriesByName('first-contentful-paint')[0];
+        done({ settled: mounted && now <= timeout, load_ms: last, first_render_ms: paint ? paint.startTime : null });
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
+# Performs one interaction and resolves with the time until the frame after
+# React's update was painted (two animation frames after the event).
+_ACTION_SCRIPT = """
+var action = arguments[0], done = arguments[arguments.length - 1];
+function norm(text) { return String(text || '').replace(/\\s+/g, ' ').trim(); }
+function byText(text) {
+    var nodes = document.querySelectorAll('button, a');
+    for (var i = 0; i < nodes.length; i++) {
+        if (norm(nodes[i].textContent).indexOf(text) !== -1) return nodes[i];
+    }
+    return null;
+}
+function bySelectLabel(text) {
+    var labels = document.querySelectorAll('label');
+    for (var i = 0; i < labels.length; i++) {
+        if (norm(labels[i].textContent) === text && labels[i].parentElement) {
+            return labels[i].parentElement.querySelector('select');
+        }
+    }
+    return null;
+}
+var target = action[0] === 'select' ? bySelectLabel(action[1]) : byText(action[1]);
+if (!target || (action[0] === 'select' && target.options.length <= action[2])) { done(null); return; }
+
+var start = performance.now();
+if (action[0] === 'select') {
+    var setter = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;
+    setter.call(target, target.options[action[2]].value);
+    target.dispatchEvent(new Event('change', { bubbles: true }));
+} else {
+    target.click();
+}
+requestAnimationFrame(function () {
+    requestAnimationFrame(function () { done(performance.now() - start); });
+});
+"""
+
+
+def page_url(test_url: str, path: str) -> str:
+    """test_url with its path replaced, keeping the qa_* query parameters."""
+    parts = urlsplit(test_url)
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
+
+
+def _load(browser, url: str) -> dict:
+    browser.driver.get(url)
+    browser.driver.set_script_timeout(LOAD_TIMEOUT_MS / 1000 + 10)
+    return browser.driver.execute_async_script(_SETTLE_SCRIPT, SETTLE_MS, LOAD_TIMEOUT_MS)
+
+
+def _act(browser, action) -> float:
+    return browser.driver.execute_async_script(_ACTION_SCRIPT, list(action))
+
+
+def measure_page(browser, test_url: str, spec: dict, repeats: int = 3) -> dict:
+    """
+    Median timings (ms) for one page over several fresh loads.
+
+    Returns:
+        Dict with load_ms, first_render_ms, interaction_ms, modal_ms
+        (None where the page has no such step or it could not be found)
+    """
+    url = page_url(test_url, spec["path"])
+    samples = {"load_ms": [], "first_render_ms": [], "interaction_ms": [], "modal_ms": []}
+
+    for _ in range(repeats):
+        timings = _load(browser, url)
+        if timings.get("settled"):
+            samples["load_ms"].append(timings["load_ms"])
+        if timings.get("first_render_ms") is not None:
+            samples["first_render_ms"].append(timings["first_render_ms"])
+
+        if spec.get("interaction"):
+            elapsed = _act(browser, spec["interaction"])
+            if elapsed is not None:
+                samples["interaction_ms"].append(elapsed)
+
+        if spec.get("modal"):
+            _load(browser, url)
+            elapsed = _act(browser, ("click", spec["modal"]))
+            if elapsed is not None:
+                samples["modal_ms"].append(elapsed)
+
+    return {name: round(statistics.median(values), 1) if values else None for name, values in samples.items()}
+
+
+def fit_scaling(sizes: list, values: list) -> dict:
+    """
+    Fit latency = a + b * n^k (a, b >= 0) over a grid of exponents.
+
+    The constant a absorbs fixed overhead (startup, network) that would
+    otherwise flatten a plain log-log slope at small sizes.
+
+    Returns:
+        Dict with exponent k, a, b, r2 and a complexity label, or None if
+        fewer than 3 points are available
+    """
+    points = [(n, v) for n, v in zip(sizes, values) if v is not None and n > 0]
+    if len(points) < 3:
+        return None
+
+    ys = [v for _, v in points]
+    mean_y = sum(ys) / len(ys)
+    total = sum((y - mean_y) ** 2 for y in ys) or 1e-12
+
+    best = None
+    for step in range(0, 61):
+        k = step * 0.05
+        xs = [n ** k for n, _ in points]
+        mean_x = sum(xs) / len(xs)
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        b = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+        b = max(b, 0.0)
+        a = max(mean_y - b * mean_x, 0.0)
+        residual = sum((y - a - b * x) ** 2 for x, y in zip(xs, ys))
+        if best is None or residual < best[0] - 1e-9:
+            best = (residual, k, a, b)
+
+    residual, k, a, b = best
+    if b * max(n for n, _ in points) ** k < 0.1 * a or k < 0.15:
+        label = "O(1)"
+        k = 0.0  # growth is within noise, the exponent means nothing
+    elif k < 0.75:
+        label = "O(sqrt n)"
+    elif k < 1.25:
+        label = "O(n)"
+    elif k < 1.75:
+        label = "O(n^1.5)"
+    else:
+        label = "O(n^2)"
+    return {"k": round(k, 2), "a": round(a, 2), "b": round(b, 6), "r2": round(1 - residual / total, 3), "complexity": label}
+
+
+def run_benchmark(browser, test_url: str, sizes: list, output_dir: str,
+                  pages: list = None, repeats: int = 3) -> str:
+    """
+    Seed each size, measure every page and write qa_benchmark_<ts>.json.
+
+    Returns:
+        Report path, or None if seeding failed
+    """
+    from execution.qa import test_data
+
+    pages = pages or list(BENCH_PAGES)
+    results = {page: {} for page in pages}
+
+    for size in sizes:
+        print(f"\n{'='*50}")
+        print(f"BENCHMARK: {size} animals")
+        print(f"{'='*50}")
+        if not test_data.seed_scale_data(size):
+            return None
+        for page in pages:
+            timings = measure_page(browser, test_url, BENCH_PAGES[page], repeats)
+            results[page][size] = timings
+            print(f"  {page:<10} " + "  ".join(
+                f"{name[:-3]} {value:>8.1f}ms" if value is not None else f"{name[:-3]}        -"
+                for name, value in timings.items()))
+
+    fits = {}
+    for page in pages:
+        fits[page] = {}
+        for metric in ("load_ms", "first_render_ms", "interaction_ms", "modal_ms"):
+            fit = fit_scaling(sizes, [results[page][size][metric] for size in sizes])
+            if fit:
+                fits[page][metric] = fit
+
+    print(f"\n{'='*50}")
+    print("SCALING (latency = a + b·n^k, n = animals)")
+    print(f"{'='*50}")
+    for page in pages:
+        for metric, fit in fits[page].items():
+            print(f"  {page:<10} {metric[:-3]:<13} k={fit['k']:<5} {fit['complexity']:<11} (R² {fit['r2']})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"qa_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w') as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "sizes": sizes,
+            "repeats": repeats,
+            "results": {page: {str(size): t for size, t in by_size.items()} for page, by_size in results.items()},
+            "scaling": fits,
+        }, f, indent=2)
+    return report_path
@@ -0,0 +1,254 @@
+"""
+Persistent warm browser daemon for QA runs.
+Keeps Chrome + chromedriver alive with the app loaded so consecutive
+qa_runner invocations can attach instead of paying startup and the
+Vite cold compile every time.
+
+Usage:
+    python browser_daemon.py start              # Start daemon in background
+    python browser_daemon.py start --headless
+    python browser_daemon.py status             # Show session info
+    python browser_daemon.py stop               # Stop daemon and browser
+
+    python qa_runner.py --daemon                # Attach (starts daemon if needed)
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from execution.qa.browser_utils import BrowserHelper
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+STATE_FILE = ROOT_DIR / '.tmp' / 'qa_browser_daemon.json'
+LOG_FILE = ROOT_DIR / '.tmp' / 'qa_browser_daemon.log'
+
+HEALTH_INTERVAL = 5  # seconds between health checks
+
+
+def qa_url(url: str) -> str:
+    """Add the qa_test parameter that bypasses authentication."""
+    if 'qa_test=true' in url:
+        return url
+    return url + ('&' if '?' in url else '?') + 'qa_test=true'
+
+
+def read_state():
+    """Return the daemon state dict, or None if no daemon is recorded."""
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(state: dict):
+    os.makedirs(STATE_FILE.parent, exist_ok=True)
+    tmp_path = str(STATE_FILE) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def _pid_alive(pid: int) -> bool:
+    if not pid:
+        return False
+    if os.name == 'nt':
+        result = subprocess.run(['tasklist', '/FI', f'PID eq {pid}'], capture_output=True, text=True)
+        return str(pid) in result.stdout
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def _launch(url: str, headless: bool) -> BrowserHelper:
+    """Start a browser, load the app and return it."""
+    browser = BrowserHelper(headless=headless).start()
+    browser.reset_state(url, timeout=60)  # first load pays the Vite cold compile
+    return browser
+
+
+def serve(url: str, headless: bool):
+    """Run the daemon loop: keep a healthy session and restart it on failure."""
+    running = True
+
+    def _shutdown(signum, frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    browser = None
+    restarts = 0
+    try:
+        while running:
+            if browser is None or not browser.is_alive():
+                if browser is not None:
+                    print(f"[QA] Browser session lost, restarting...", flush=True)
+                    restarts += 1
+                    try:
+                        browser.stop()
+                    except Exception:
+                        pass
+                    browser = None
+                try:
+                    browser = _launch(url, headless)
+                except Exception as e:
+                    print(f"[QA] Could not start browser: {e}", flush=True)
+                    time.sleep(HEALTH_INTERVAL)
+                    continue
+                _write_state({
+                    'pid': os.getpid(),
+                    'url': url,
+                    'headless': headless,
+                    'executor_url': browser.driver.service.service_url,
+                    'session_id': browser.driver.session_id,
+                    'restarts': restarts,
+                    'started': time.time(),
+                })
+                print(f"[QA] Browser ready (session {browser.driver.session_id})", flush=True)
+            time.sleep(HEALTH_INTERVAL)
+    finally:
+        if browser:
+            browser.stop()
+        try:
+            os.remove(STATE_FILE)
+        except OSError:
+            pass
+
+
+def start(url: str, headless: bool, wait: int = 90):
+    """Spawn the daemon in the background and wait for its session."""
+    state = read_state()
+    if state and _pid_alive(state.get('pid')):
+        return state
+
+    os.makedirs(LOG_FILE.parent, exist_ok=True)
+    cmd = [sys.executable, str(Path(__file__).resolve()), 'serve', '--url', url]
+    if headless:
+        cmd.append('--headless')
+
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        kwargs['start_new_session'] = True
+
+    with open(LOG_FILE, 'a') as log:
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **kwargs)
+
+    print(f"[QA] Starting browser daemon (pid {proc.pid})...")
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        state = read_state()
+        if state and state.get('pid') == proc.pid:
+            return state
+        if proc.poll() is not None:
+            print(f"[QA] Browser daemon exited, see {LOG_FILE}")
+            return None
+        time.sleep(0.5)
+
+    print(f"[QA] Timed out waiting for browser daemon, see {LOG_FILE}")
+    return None
+
+
+def stop():
+    """Stop a running daemon."""
+    state = read_state()
+    if not state or not _pid_alive(state.get('pid')):
+        print("[QA] No browser daemon running")
+        try:
+            os.remove(STATE_FILE)
+        except OSError:
+            pass
+        return False
+
+    os.kill(state['pid'], signal.SIGTERM)
+    for _ in range(40):
+        if not _pid_alive(state['pid']):
+            break
+        time.sleep(0.25)
+    print(f"[QA] Browser daemon stopped (pid {state['pid']})")
+    return True
+
+
+def attach(url: str, headless: bool = False):
+    """
+    Return a BrowserHelper attached to the daemon's warm session.
+
+    Starts the daemon if it is not running. The session is reset to a clean
+    state (cookies, storage, fresh app load) before it is handed out.
+
+    Returns:
+        BrowserHelper, or None if no session could be obtained
+    """
+    state = read_state()
+    if not state or not _pid_alive(state.get('pid')):
+        state = start(url, headless)
+        if not state:
+            return None
+
+    browser = BrowserHelper(headless=state.get('headless', headless))
+    browser.attach(state['executor_url'], state['session_id'])
+    if not browser.is_alive():
+        # Daemon will restart the session on its next health check
+        print("[QA] Daemon session unhealthy, waiting for restart...")
+        old_session = state['session_id']
+        for _ in range(HEALTH_INTERVAL * 12):
+            time.sleep(0.5)
+            state = read_state()
+            if state and state['session_id'] != old_session:
+                browser.attach(state['executor_url'], state['session_id'])
+                break
+        if not browser.is_alive():
+            return None
+
+    browser.reset_state(url)
+    return browser
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF QA browser daemon")
+    parser.add_argument("command", choices=["start", "stop", "status", "serve"])
+    parser.add_argument("--url", default="http://localhost:5173/", help="App URL to keep loaded")
+    parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+
+    args = parser.parse_args()
+    url = qa_url(args.url)
+
+    if args.command == "serve":
+        serve(url, args.headless)
+        return 0
+    if args.command == "start":
+        state = start(url, args.headless)
+        if state:
+            print(f"[QA] Browser daemon running: {state['executor_url']} (session {state['session_id']})")
+        return 0 if state else 1
+    if args.command == "stop":
+        stop()
+        return 0
+
+    state = read_state()
+    if state and _pid_alive(state.get('pid')):
+        print(f"[QA] Browser daemon running (pid {state['pid']})")
+        print(f"   URL: {state['url']}")
+        print(f"   Session: {state['session_id']} @ {state['executor_url']}")
+        print(f"   Restarts: {state.get('restarts', 0)}")
+        return 0
+    print("[QA] No browser daemon running")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
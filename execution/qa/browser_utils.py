@@ -1,6 +1,7 @@
 """
 Browser automation utilities for QA testing.
-Uses Selenium WebDriver with Chrome.
+Uses Selenium WebDriver with Chrome, or the DevTools protocol directly
+(backend="cdp", see cdp_driver.py).
 """
 
 import os
@@ -14,23 +15,104 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 
+# Fills form fields the way React expects: the native value setter bypasses
+# React's value tracker, then input/change events bubble to its root listener.
+# Fields are set one macrotask apart so each onChange sees the state left by
+# the previous one, and values are read back after React has re-rendered.
+_FILL_FORM_SCRIPT = """
+var container = arguments[0], values = arguments[1], done = arguments[arguments.length - 1];
+var CONTROLS = 'input, select, textarea';
+
+function norm(text) { return String(text == null ? '' : text).replace(/\\s+/g, ' ').trim().toLowerCase(); }
+
+function findField(key) {
+    var el = container.querySelector('[name="' + CSS.escape(key) + '"]');
+    if (!el && /^[A-Za-z][\\w-]*$/.test(key)) el = container.querySelector('#' + CSS.escape(key));
+    if (el) return el;
+
+    var wanted = norm(key);
+    var labels = Array.prototype.slice.call(container.querySelectorAll('label'));
+    var label = labels.filter(function (l) { return norm(l.textContent) === wanted; })[0] ||
+                labels.filter(function (l) { return norm(l.textContent).indexOf(wanted) === 0; })[0];
+    if (label) {
+        if (label.control) return label.control;
+        if (label.parentElement) {
+            el = label.parentElement.querySelector(CONTROLS);
+            if (el) return el;
+        }
+    }
+
+    var controls = container.querySelectorAll(CONTROLS);
+    for (var i = 0; i < controls.length; i++) {
+        if (wanted && norm(controls[i].placeholder).indexOf(wanted) !== -1) return controls[i];
+    }
+    try { return container.querySelector(key); } catch (e) { return null; }
+}
+
+function setField(el, value) {
+    if (el.type === 'checkbox' || el.type === 'radio') {
+        if (el.checked !== Boolean(value)) el.click();
+        return String(Boolean(value));
+    }
+    if (el.tagName === 'SELECT') {
+        var options = Array.prototype.slice.call(el.options);
+        var match = options.filter(function (o) { return o.value === String(value); })[0] ||
+                    options.filter(function (o) { return norm(o.text) === norm(value); })[0];
+        if (!match) return null;
+        value = match.value;
+    }
+    var proto = el.tagName === 'SELECT' ? HTMLSelectElement.prototype :
+                el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, String(value));
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    return String(value);
+}
+
+var keys = Object.keys(values);
+var fields = [];
+
+function next(i) {
+    if (i < keys.length) {
+        var el = findField(keys[i]);
+        fields.push({ key: keys[i], el: el, expected: el ? setField(el, values[keys[i]]) : null });
+        setTimeout(function () { next(i + 1); }, 0);
+        return;
+    }
+    setTimeout(function () {
+        done(fields.map(function (f) {
+            var actual = !f.el ? null :
+                (f.el.type === 'checkbox' || f.el.type === 'radio') ? String(f.el.checked) : f.el.value;
+            return { key: f.key, ok: f.expected !== null && actual === f.expected, actual: actual };
+        }));
+    }, 0);
+}
+next(0);
+"""
+
+
 class BrowserHelper:
     """Helper class for browser automation."""
     
-    def __init__(self, headless: bool = False, timeout: int = 10):
+    def __init__(self, headless: bool = False, timeout: int = 10, backend: str = "selenium"):
         """
         Initialize browser helper.
         
         Args:
             headless: Run browser in headless mode
             timeout: Default wait timeout in seconds
+            backend: "selenium" (chromedriver) or "cdp" (DevTools websocket)
         """
         self.timeout = timeout
         self.driver = None
         self.headless = headless
+        self.backend = backend
+        self.attached = False
+        self.console_log = None
+        self.resource_monitor = None
         
-    def start(self):
-        """Start the browser."""
+    def _build_options(self):
+        """Chrome options shared by fresh starts and attached sessions."""
         options = Options()
         if self.headless:
             options.add_argument('--headless')
@@ -38,6 +120,17 @@ class BrowserHelper:
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--window-size=1920,1080')
         options.add_argument('--disable-gpu')
+        return options
+        
+    def start(self):
+        """Start the browser."""
+        options = self._build_options()
+        
+        if self.backend == "cdp":
+            from execution.qa.cdp_driver import CDPDriver
+            self.driver = CDPDriver(options.arguments).start()
+            self.driver.implicitly_wait(5)
+            return self
         
         # For Chrome 115+, try to get chromedriver from Chrome for Testing
         driver_path = self._get_chromedriver()
@@ -127,11 +220,62 @@ class BrowserHelper:
             print(f"[QA] Could not auto-download chromedriver: {e}")
             return None
         
+    def attach(self, executor_url: str, session_id: str):
+        """
+        Attach to an already running WebDriver session (see browser_daemon.py).
+        
+        Args:
+            executor_url: chromedriver URL, e.g. http://127.0.0.1:9515
+            session_id: Existing WebDriver session id
+        """
+        self.driver = _AttachedDriver(executor_url, session_id, self._build_options())
+        self.attached = True
+        return self
+        
+    def is_alive(self) -> bool:
+        """Health check: True if the session still answers commands."""
+        if not self.driver:
+            return False
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+            
+    def reset_state(self, url: str, timeout: int = None):
+        """
+        Bring a reused session back to a clean state and load the app.
+        
+        Clears cookies and web storage, then loads url and waits for React
+        to mount instead of sleeping a fixed amount.
+        """
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass  # about:blank has no storage
+        self.driver.get(url)
+        timeout = timeout or self.timeout
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script(
+                    "var root = document.getElementById('root');"
+                    "return document.readyState === 'complete' && !!root && root.children.length > 0;"
+                )
+            )
+        except TimeoutException:
+            pass
+        
     def stop(self):
-        """Stop the browser."""
+        """Stop the browser. Attached sessions are left running for the daemon."""
+        if self.console_log:
+            self.console_log.stop()
+            self.console_log = None
         if self.driver:
-            self.driver.quit()
+            if not self.attached:
+                self.driver.quit()
             self.driver = None
+            self.attached = False
             
     def navigate(self, url: str):
         """Navigate to a URL."""
@@ -189,6 +333,32 @@ class BrowserHelper:
             return True
         return False
         
+    def fill_form(self, container, values: dict, by: str = "css") -> list:
+        """
+        Fill several form fields in one script call.
+        
+        Fields are looked up inside the container by name, id, label text,
+        placeholder, or finally as a CSS selector. Values are set through
+        the native setters with input/change events so React's controlled
+        inputs pick them up, then read back to verify.
+        
+        Args:
+            container: Selector for the form/modal, or a WebElement
+            values: Dict of field key -> value (option value or visible
+                    text for selects, bool for checkboxes)
+            by: "css" or "xpath" when container is a selector
+            
+        Returns:
+            List of field keys that could not be set or did not keep their
+            value (empty on success)
+        """
+        if isinstance(container, str):
+            container = self.wait_for_element(container, by)
+            if not container:
+                return list(values)
+        results = self.driver.execute_async_script(_FILL_FORM_SCRIPT, container, values)
+        return [r["key"] for r in results if not r["ok"]]
+        
     def get_text(self, selector: str, by: str = "css") -> str:
         """Get text content of an element."""
         element = self.wait_for_element(selector, by)
@@ -209,8 +379,16 @@ class BrowserHelper:
         elements = self.get_elements(selector, by)
         return len(elements) > 0
         
+    def start_console_log(self):
+        """Collect console/exception/network errors for the rest of the run (see console_log.py)."""
+        from execution.qa.console_log import ConsoleLog
+        self.console_log = ConsoleLog(self.driver).start()
+        return self.console_log
+        
     def get_console_errors(self) -> list:
-        """Get browser console errors."""
+        """Get browser console errors (everything seen this run when the collector is running)."""
+        if self.console_log:
+            return self.console_log.errors()
         logs = self.driver.get_log('browser')
         return [log for log in logs if log['level'] == 'SEVERE']
         
@@ -229,24 +407,45 @@ class BrowserHelper:
         return False
 
 
+class _AttachedDriver(webdriver.Remote):
+    """Remote driver that reuses an existing session instead of creating one."""
+    
+    def __init__(self, executor_url: str, session_id: str, options):
+        self._existing_session_id = session_id
+        super().__init__(command_executor=executor_url, options=options)
+        
+    def start_session(self, *args, **kwargs):
+        self.session_id = self._existing_session_id
+        self.caps = {}
+
+
 class TestResult:
     """Container for test results."""
     
     def __init__(self, name: str):
         self.name = name
         self.passed = False
+        self.skipped = False
         self.error = None
         self.duration = 0
         self.details = {}
+        self.console = None
+        self.resources = None
         
     def to_dict(self):
-        return {
+        result = {
             "name": self.name,
             "passed": self.passed,
+            "skipped": self.skipped,
             "error": self.error,
             "duration": self.duration,
             "details": self.details
         }
+        if self.console:
+            result["console"] = self.console
+        if self.resources:
+            result["resources"] = self.resources
+        return result
 
 
 def run_test(name: str, test_fn, browser: BrowserHelper) -> TestResult:
@@ -262,6 +461,10 @@ def run_test(name: str, test_fn, browser: BrowserHelper) -> TestResult:
         TestResult object
     """
     result = TestResult(name)
+    if browser.console_log:
+        browser.console_log.begin()
+    if browser.resource_monitor:
+        browser.resource_monitor.begin()
     start = time.time()
     
     try:
@@ -275,4 +478,8 @@ def run_test(name: str, test_fn, browser: BrowserHelper) -> TestResult:
         result.error = str(e)
         
     result.duration = round(time.time() - start, 2)
+    if browser.console_log:
+        result.console = browser.console_log.end()
+    if browser.resource_monitor:
+        result.resources = browser.resource_monitor.end()
     return result
@@ -0,0 +1,714 @@
+"""
+Chrome DevTools Protocol driver for QA runs.
+Talks to Chrome directly over its DevTools websocket (no chromedriver hop)
+from an asyncio loop running in a background thread. Exposes the subset of
+Selenium's WebDriver/WebElement API that BrowserHelper and the test suites
+use, so `qa_runner.py --driver cdp` runs the existing tests unchanged.
+
+- Commands are pipelined: several can be in flight on one websocket and
+  pipeline() sends a group before waiting for any reply.
+- Console messages, exceptions and log entries arrive as events and are
+  buffered for get_log('browser') instead of being polled; subscribe()
+  exposes any other CDP event (DOM, Network, ...).
+- All drivers share one event loop, so a single Python process can drive
+  many browsers concurrently.
+
+Requires: pip install websockets
+"""
+
+import asyncio
+import base64
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+CHROME_CANDIDATES = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+LOG_BUFFER_SIZE = 1000     # console entries kept until get_log() drains them
+PAGE_LOAD_TIMEOUT = 60     # seconds
+COMMAND_TIMEOUT = 30       # seconds for a single CDP command
+
+# Installed in the page on first use. Elements handed to Python are kept in a
+# per-document registry and referenced by key, so scripts can be evaluated by
+# value in one round trip. A navigation clears the registry (stale elements).
+_PRELUDE = """
+if (!window.__qaCdp) {
+    window.__qaCdp = (function () {
+        var registry = new Map(), next = 1;
+        function encode(value, depth) {
+            depth = depth || 0;
+            if (value instanceof Node) {
+                var key = next++;
+                registry.set(key, value);
+                return { __qaEl: key };
+            }
+            if (depth > 20 || value === null || value === undefined) return value === undefined ? null : value;
+            if (value instanceof NodeList || value instanceof HTMLCollection) value = Array.prototype.slice.call(value);
+            if (Array.isArray(value)) return value.map(function (v) { return encode(v, depth + 1); });
+            if (typeof value === 'object') {
+                var out = {};
+                Object.keys(value).forEach(function (k) { out[k] = encode(value[k], depth + 1); });
+                return out;
+            }
+            return typeof value === 'function' ? null : value;
+        }
+        function decode(value) {
+            if (Array.isArray(value)) return value.map(decode);
+            if (value && typeof value === 'object') {
+                if ('__qaEl' in value) {
+                    var el = registry.get(value.__qaEl);
+                    if (!el || !el.isConnected) throw new Error('stale element reference');
+                    return el;
+                }
+                var out = {};
+                Object.keys(value).forEach(function (k) { out[k] = decode(value[k]); });
+                return out;
+            }
+            return value;
+        }
+        function find(root, by, selector) {
+            root = root || document;
+            if (by === 'xpath') {
+                var snapshot = document.evaluate(selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                var nodes = [];
+                for (var i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+                return nodes;
+            }
+            return Array.prototype.slice.call(root.querySelectorAll(selector));
+        }
+        return { encode: encode, decode: decode, find: find };
+    })();
+}
+"""
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """Shared asyncio loop running in a daemon thread."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='cdp-loop', daemon=True).start()
+        return _loop
+
+
+def find_chrome():
+    """Path to a Chrome/Chromium binary (CHROME_PATH wins), or None."""
+    if os.environ.get('CHROME_PATH'):
+        return os.environ['CHROME_PATH']
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def _css_for(by, value):
+    """Map Selenium locator strategies onto css/xpath."""
+    if by == 'xpath':
+        return 'xpath', value
+    if by == 'id':
+        return 'css', f'[id="{value}"]'
+    if by == 'name':
+        return 'css', f'[name="{value}"]'
+    if by == 'class name':
+        return 'css', f'.{value}'
+    if by == 'link text':
+        return 'xpath', f'//a[normalize-space(.)="{value}"]'
+    return 'css', value  # 'css selector', 'tag name'
+
+
+class CDPConnection:
+    """One DevTools websocket with pipelined commands and event callbacks."""
+
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self.loop = _event_loop()
+        self.ws = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = collections.defaultdict(list)
+        self._reader = None
+
+    def _run(self, coro, timeout):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Not the builtin TimeoutError before Python 3.11
+            future.cancel()
+            raise TimeoutException(f"CDP call timed out after {timeout}s")
+
+    def connect(self):
+        try:
+            import websockets
+        except ImportError:
+            raise WebDriverException("websockets not installed. Run: pip install websockets")
+
+        async def _connect():
+            self.ws = await websockets.connect(self.ws_url, max_size=None, ping_interval=None)
+            self._reader = asyncio.ensure_future(self._read())
+        self._run(_connect(), COMMAND_TIMEOUT)
+        return self
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.pop(message['id'], None)
+                    if future and not future.done():
+                        future.set_result(message)
+                    continue
+                key = (message.get('sessionId'), message.get('method'))
+                for callback in list(self._listeners.get(key, [])):
+                    try:
+                        callback(message.get('params', {}))
+                    except Exception:
+                        pass  # a broken listener must not stop the reader
+        except Exception:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(WebDriverException("DevTools connection closed"))
+            self._pending.clear()
+
+    async def _send(self, method, params=None, session_id=None):
+        command_id = next(self._ids)
+        future = self.loop.create_future()
+        self._pending[command_id] = future
+        message = {'id': command_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        await self.ws.send(json.dumps(message))
+        return future
+
+    @staticmethod
+    def _result(message, method):
+        if 'error' in message:
+            raise WebDriverException(f"{method}: {message['error'].get('message')}")
+        return message.get('result', {})
+
+    def call(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        """Send one command and wait for its result."""
+        async def _call():
+            return await (await self._send(method, params, session_id))
+        return self._result(self._run(_call(), timeout), method)
+
+    def pipeline(self, commands, session_id=None, timeout=COMMAND_TIMEOUT):
+        """Send (method, params) commands back to back, then wait for all results in order."""
+        async def _all():
+            futures = [await self._send(method, params, session_id) for method, params in commands]
+            return await asyncio.gather(*futures)
+        messages = self._run(_all(), timeout)
+        return [self._result(m, method) for m, (method, _) in zip(messages, commands)]
+
+    def on(self, method, callback, session_id=None):
+        """Call callback(params) from the event loop for every matching event."""
+        self.loop.call_soon_threadsafe(self._listeners[(session_id, method)].append, callback)
+
+    def off(self, method, callback, session_id=None):
+        def _remove():
+            listeners = self._listeners.get((session_id, method), [])
+            if callback in listeners:
+                listeners.remove(callback)
+        self.loop.call_soon_threadsafe(_remove)
+
+    def wait_for_event(self, method, trigger, session_id=None, timeout=PAGE_LOAD_TIMEOUT):
+        """Run trigger() and wait for the next matching event (listener set up first)."""
+        received = threading.Event()
+        payload = {}
+
+        def _listener(params):
+            payload.update(params)
+            received.set()
+
+        self._run(self._add_listener(method, _listener, session_id), COMMAND_TIMEOUT)
+        try:
+            trigger()
+            if not received.wait(timeout):
+                raise TimeoutException(f"Timed out waiting for {method}")
+            return payload
+        finally:
+            self.off(method, _listener, session_id)
+
+    async def _add_listener(self, method, callback, session_id):
+        self._listeners[(session_id, method)].append(callback)
+
+    def close(self):
+        async def _close():
+            if self.ws:
+                await self.ws.close()
+            if self._reader:
+                await asyncio.wait([self._reader], timeout=2)
+        try:
+            self._run(_close(), 5)
+        except Exception:
+            pass
+
+
+class CDPElement:
+    """Selenium-style WebElement backed by a page-side registry key."""
+
+    def __init__(self, driver, key):
+        self._driver = driver
+        self._key = key
+
+    def __eq__(self, other):
+        return isinstance(other, CDPElement) and other._key == self._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    @property
+    def id(self):
+        return str(self._key)
+
+    def _js(self, body, *args):
+        return self._driver.execute_script(body, self, *args)
+
+    @property
+    def tag_name(self):
+        return self._js("return arguments[0].tagName.toLowerCase();")
+
+    @property
+    def text(self):
+        return self._js("var el = arguments[0]; return (el.innerText !== undefined ? el.innerText : el.textContent || '').trim();")
+
+    def get_attribute(self, name):
+        return self._js("""
+            var el = arguments[0], name = arguments[1], value = el[name];
+            if (value === undefined || value === null || typeof value === 'object' || typeof value === 'function') {
+                value = el.getAttribute(name);
+            }
+            if (value === false) return null;
+            return value === null ? null : String(value);
+        """, name)
+
+    def get_dom_attribute(self, name):
+        return self._js("return arguments[0].getAttribute(arguments[1]);", name)
+
+    def get_property(self, name):
+        return self._js("return arguments[0][arguments[1]];", name)
+
+    def is_displayed(self):
+        return self._js("""
+            var el = arguments[0], style = window.getComputedStyle(el), rect = el.getBoundingClientRect();
+            return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+        """)
+
+    def is_enabled(self):
+        return self._js("return !arguments[0].disabled;")
+
+    def is_selected(self):
+        return self._js("var el = arguments[0]; return !!(el.selected || el.checked);")
+
+    def click(self):
+        """Scroll into view and click with real mouse events (options are selected directly)."""
+        box = self._js("""
+            var el = arguments[0];
+            if (el.tagName === 'OPTION') {
+                var select = el.closest('select');
+                el.selected = true;
+                if (select) {
+                    select.dispatchEvent(new Event('input', { bubbles: true }));
+                    select.dispatchEvent(new Event('change', { bubbles: true }));
+                }
+                return null;
+            }
+            el.scrollIntoView({ block: 'center', inline: 'center' });
+            var rect = el.getBoundingClientRect();
+            return { x: rect.left + rect.width / 2, y: rect.top + rect.height / 2, w: rect.width, h: rect.height };
+        """)
+        if box is None:
+            return
+        if not box['w'] or not box['h']:
+            raise ElementNotInteractableException("element has no size and cannot be clicked")
+        mouse = {'x': box['x'], 'y': box['y'], 'button': 'left', 'clickCount': 1}
+        self._driver.pipeline([
+            ('Input.dispatchMouseEvent', {'type': 'mouseMoved', 'x': box['x'], 'y': box['y']}),
+            ('Input.dispatchMouseEvent', {'type': 'mousePressed', **mouse}),
+            ('Input.dispatchMouseEvent', {'type': 'mouseReleased', **mouse}),
+        ])
+
+    def clear(self):
+        self._js("""
+            var el = arguments[0];
+            var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, '');
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        """)
+
+    def send_keys(self, *values):
+        """Type text at the end of the field. Enter/Tab are sent as key events."""
+        self._js("arguments[0].focus();")
+        commands = []
+        text = ''.join(str(v) for v in values)
+        for chunk in _split_keys(text):
+            if chunk in _SPECIAL_KEYS:
+                key, code = _SPECIAL_KEYS[chunk]
+                commands.append(('Input.dispatchKeyEvent', {'type': 'keyDown', 'key': key, 'code': key,
+                                                           'windowsVirtualKeyCode': code, 'text': '\r' if key == 'Enter' else ''}))
+                commands.append(('Input.dispatchKeyEvent', {'type': 'keyUp', 'key': key, 'code': key,
+                                                           'windowsVirtualKeyCode': code}))
+            elif chunk:
+                commands.append(('Input.insertText', {'text': chunk}))
+        if commands:
+            self._driver.pipeline(commands)
+
+    def submit(self):
+        self._js("var form = arguments[0].form || arguments[0].closest('form'); if (form) form.requestSubmit();")
+
+    def find_elements(self, by='css selector', value=None):
+        return self._driver.find_elements(by, value, root=self)
+
+    def find_element(self, by='css selector', value=None):
+        return self._driver.find_element(by, value, root=self)
+
+    def screenshot(self, filename):
+        rect = self._js("var r = arguments[0].getBoundingClientRect(); return {x: r.left + window.scrollX, y: r.top + window.scrollY, w: r.width, h: r.height};")
+        return self._driver._capture(filename, {'x': rect['x'], 'y': rect['y'], 'width': rect['w'], 'height': rect['h'], 'scale': 1})
+
+
+# Selenium Keys codepoints -> (key, virtual key code)
+_SPECIAL_KEYS = {
+    '\ue007': ('Enter', 13),
+    '\ue006': ('Enter', 13),
+    '\ue004': ('Tab', 9),
+    '\ue003': ('Backspace', 8),
+    '\ue00c': ('Escape', 27),
+}
+
+
+def _split_keys(text):
+    """Split text into plain runs and single special-key characters."""
+    run = ''
+    for char in text:
+        if char in _SPECIAL_KEYS:
+            if run:
+                yield run
+                run = ''
+            yield char
+        elif '\ue000' <= char <= '\uf8ff':
+            continue  # other Selenium modifier keys are not supported
+        else:
+            run += char
+    if run:
+        yield run
+
+
+def console_entry(params):
+    """Selenium-style log entry from a Runtime.consoleAPICalled event."""
+    level = {'error': 'SEVERE', 'assert': 'SEVERE', 'warning': 'WARNING'}.get(params.get('type'), 'INFO')
+    text = ' '.join(str(a.get('value', a.get('description', ''))) for a in params.get('args', []))
+    return {'level': level, 'message': text, 'source': 'console-api',
+            'timestamp': int(params.get('timestamp', time.time() * 1000))}
+
+
+def exception_entry(params):
+    """Selenium-style log entry from a Runtime.exceptionThrown event."""
+    details = params.get('exceptionDetails', {})
+    text = details.get('exception', {}).get('description') or details.get('text', '')
+    return {'level': 'SEVERE', 'message': text, 'source': 'javascript',
+            'timestamp': int(params.get('timestamp', time.time() * 1000))}
+
+
+def log_entry(params):
+    """Selenium-style log entry from a Log.entryAdded event."""
+    entry = params.get('entry', {})
+    level = {'error': 'SEVERE', 'warning': 'WARNING'}.get(entry.get('level'), 'INFO')
+    message = f"{entry.get('url', '')} - {entry.get('text', '')}".strip(' -')
+    return {'level': level, 'message': message, 'source': entry.get('source', 'other'),
+            'timestamp': int(entry.get('timestamp', time.time() * 1000))}
+
+
+class CDPDriver:
+    """Selenium-compatible driver on top of a CDP page session."""
+
+    def __init__(self, arguments=None):
+        self.arguments = list(arguments or [])
+        self.process = None
+        self.user_data_dir = None
+        self.connection = None
+        self.session_id = None
+        self.target_id = None
+        self.implicit_wait = 0
+        self.script_timeout = 30
+        self.page_load_timeout = PAGE_LOAD_TIMEOUT
+        self.console = collections.deque(maxlen=LOG_BUFFER_SIZE)
+        self._enabled_domains = set()
+
+    # Lifecycle
+
+    def start(self):
+        """Launch Chrome with a DevTools port and attach to its first tab."""
+        chrome = find_chrome()
+        if not chrome:
+            raise WebDriverException("Chrome not found. Set CHROME_PATH to the Chrome/Chromium binary")
+
+        self.user_data_dir = tempfile.mkdtemp(prefix='qa_cdp_')
+        args = [chrome, '--remote-debugging-port=0', f'--user-data-dir={self.user_data_dir}',
+                '--no-first-run', '--no-default-browser-check', *self.arguments, 'about:blank']
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome writes the port it picked to DevToolsActivePort
+        port_file = os.path.join(self.user_data_dir, 'DevToolsActivePort')
+        deadline = time.time() + 30
+        while True:
+            try:
+                with open(port_file) as f:
+                    content = f.read().strip()
+            except OSError:
+                content = ''  # not written yet
+            if content:
+                break
+            if self.process.poll() is not None or time.time() > deadline:
+                self.quit()
+                raise WebDriverException("Chrome did not open a DevTools port")
+            time.sleep(0.05)
+        port = content.split()[0]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=10) as response:
+            ws_url = json.loads(response.read().decode())['webSocketDebuggerUrl']
+
+        self.connection = CDPConnection(ws_url).connect()
+        targets = self.connection.call('Target.getTargets')['targetInfos']
+        page = next((t for t in targets if t['type'] == 'page'), None)
+        self.target_id = page['targetId'] if page else self.connection.call(
+            'Target.createTarget', {'url': 'about:blank'})['targetId']
+        self.session_id = self.connection.call(
+            'Target.attachToTarget', {'targetId': self.target_id, 'flatten': True})['sessionId']
+
+        for method, handler in (('Runtime.consoleAPICalled', self._on_console),
+                                ('Runtime.exceptionThrown', self._on_exception),
+                                ('Log.entryAdded', self._on_log_entry)):
+            self.connection.on(method, handler, self.session_id)
+        self.pipeline([('Page.enable', {}), ('Runtime.enable', {}), ('Log.enable', {})])
+        self._enabled_domains.update({'Page', 'Runtime', 'Log'})
+        return self
+
+    def quit(self):
+        if self.connection:
+            try:
+                self.connection.call('Browser.close', timeout=5)
+            except Exception:
+                pass
+            self.connection.close()
+            self.connection = None
+        if self.process:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+    # Raw protocol access
+
+    def execute_cdp_cmd(self, method, params=None):
+        """Run a CDP command on the page session (same name as Selenium's Chrome driver)."""
+        return self.connection.call(method, params, self.session_id)
+
+    def pipeline(self, commands):
+        """Send several (method, params) page commands without waiting in between."""
+        return self.connection.pipeline(commands, self.session_id)
+
+    def subscribe(self, event, callback):
+        """
+        Call callback(params) for every occurrence of a CDP event, e.g.
+        'Network.loadingFailed'. The event's domain is enabled on first use.
+        Callbacks run on the event loop thread and must not block.
+        """
+        domain = event.split('.')[0]
+        if domain not in self._enabled_domains:
+            self.execute_cdp_cmd(f"{domain}.enable")
+            self._enabled_domains.add(domain)
+        self.connection.on(event, callback, self.session_id)
+
+    def unsubscribe(self, event, callback):
+        self.connection.off(event, callback, self.session_id)
+
+    # Console events
+
+    def _on_console(self, params):
+        self.console.append(console_entry(params))
+
+    def _on_exception(self, params):
+        self.console.append(exception_entry(params))
+
+    def _on_log_entry(self, params):
+        self.console.append(log_entry(params))
+
+    def get_log(self, log_type):
+        """Drain buffered console entries (only 'browser' is supported)."""
+        if log_type != 'browser':
+            return []
+        entries = []
+        while self.console:
+            entries.append(self.console.popleft())
+        return entries
+
+    # Navigation
+
+    def _navigate(self, method, params):
+        def _trigger():
+            result = self.execute_cdp_cmd(method, params)
+            if result.get('errorText'):
+                raise WebDriverException(f"Navigation failed: {result['errorText']}")
+        self.connection.wait_for_event('Page.loadEventFired', _trigger, self.session_id, self.page_load_timeout)
+
+    def get(self, url):
+        self._navigate('Page.navigate', {'url': url})
+
+    def refresh(self):
+        self._navigate('Page.reload', {})
+
+    def back(self):
+        self.execute_script("history.back();")
+
+    @property
+    def current_url(self):
+        return self.execute_script("return location.href;")
+
+    @property
+    def title(self):
+        return self.execute_script("return document.title;")
+
+    @property
+    def page_source(self):
+        return self.execute_script("return document.documentElement.outerHTML;")
+
+    def delete_all_cookies(self):
+        self.execute_cdp_cmd('Network.clearBrowserCookies')
+
+    # Timeouts
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    # Scripts
+
+    def _encode_args(self, args):
+        def _encode(value):
+            if isinstance(value, CDPElement):
+                return {'__qaEl': value._key}
+            if isinstance(value, (list, tuple)):
+                return [_encode(v) for v in value]
+            if isinstance(value, dict):
+                return {k: _encode(v) for k, v in value.items()}
+            return value
+        return json.dumps([_encode(a) for a in args])
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if isinstance(value, dict):
+            if set(value) == {'__qaEl'}:
+                return CDPElement(self, value['__qaEl'])
+            return {k: self._decode(v) for k, v in value.items()}
+        return value
+
+    def _evaluate(self, expression, await_promise=False, timeout=COMMAND_TIMEOUT):
+        result = self.connection.call('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': await_promise,
+            'userGesture': True,
+        }, self.session_id, timeout=timeout)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            message = details.get('exception', {}).get('description') or details.get('text', 'script error')
+            if 'stale element reference' in message:
+                raise StaleElementReferenceException(message)
+            raise JavascriptException(message)
+        return self._decode(result.get('result', {}).get('value'))
+
+    def execute_script(self, script, *args):
+        expression = (f"(function () {{ {_PRELUDE} var q = window.__qaCdp, args = q.decode({self._encode_args(args)});"
+                      f" return q.encode((function () {{ {script}\n }}).apply(null, args)); }})()")
+        return self._evaluate(expression)
+
+    def execute_async_script(self, script, *args):
+        timeout_ms = int(self.script_timeout * 1000)
+        expression = (f"(function () {{ {_PRELUDE} var q = window.__qaCdp, args = q.decode({self._encode_args(args)});"
+                      f" return new Promise(function (resolve, reject) {{"
+                      f" setTimeout(function () {{ reject(new Error('script timeout')); }}, {timeout_ms});"
+                      f" args.push(function (result) {{ resolve(q.encode(result)); }});"
+                      f" try {{ (function () {{ {script}\n }}).apply(null, args); }} catch (e) {{ reject(e); }}"
+                      f" }}); }})()")
+        try:
+            return self._evaluate(expression, await_promise=True, timeout=self.script_timeout + 5)
+        except JavascriptException as e:
+            if 'script timeout' in str(e):
+                raise TimeoutException(f"Script did not finish within {self.script_timeout}s")
+            raise
+
+    # Elements
+
+    def find_elements(self, by='css selector', value=None, root=None):
+        """Find elements, retrying until the implicit wait expires while none match."""
+        strategy, selector = _css_for(by, value)
+        deadline = time.time() + self.implicit_wait
+        while True:
+            elements = self.execute_script("return window.__qaCdp.find(arguments[0], arguments[1], arguments[2]);",
+                                           root, strategy, selector)
+            if elements or time.time() >= deadline:
+                return elements
+            time.sleep(0.1)
+
+    def find_element(self, by='css selector', value=None, root=None):
+        elements = self.find_elements(by, value, root)
+        if not elements:
+            raise NoSuchElementException(f"No element matches {by}={value}")
+        return elements[0]
+
+    # Screenshots
+
+    def _capture(self, filename, clip=None):
+        params = {'format': 'png'}
+        if clip:
+            params.update({'clip': clip, 'captureBeyondViewport': True})
+        data = self.execute_cdp_cmd('Page.captureScreenshot', params)['data']
+        with open(filename, 'wb') as f:
+            f.write(base64.b64decode(data))
+        return True
+
+    def save_screenshot(self, filename):
+        return self._capture(filename)
+
+    get_screenshot_as_file = save_screenshot
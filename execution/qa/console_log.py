@@ -0,0 +1,197 @@
+"""
+Continuous browser console collection for QA runs.
+Gathers console messages, uncaught exceptions and failed network requests
+for the whole run and files them under the test that was running, so
+errors raised by any test end up in its result.
+
+- CDP driver: subscribes to Runtime/Log/Network events as they happen
+- Selenium: drains driver.get_log('browser') on a background thread
+
+Each test gets a bounded ring buffer of distinct messages; repeats only bump
+a count, so memory stays constant however long the run is.
+"""
+
+import collections
+import threading
+import time
+
+CAPACITY = 50            # distinct messages kept per test (oldest evicted)
+SESSION_CAPACITY = 200   # distinct errors kept for the whole run
+MESSAGE_LIMIT = 500      # characters kept per message
+POLL_INTERVAL = 1.0      # seconds between get_log() drains (Selenium)
+REQUEST_URLS = 256       # in-flight request urls remembered for loadingFailed
+
+
+class _Buffer:
+    """Ring buffer of deduplicated log entries. When full, the oldest non-error entry is evicted first."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.dropped = 0
+        self.errors = 0
+
+    def add(self, entry):
+        if entry['level'] == 'SEVERE':
+            self.errors += 1
+        key = (entry['level'], entry['source'], entry['message'])
+        existing = self.entries.get(key)
+        if existing:
+            existing['count'] += 1
+            existing['last'] = entry['timestamp']
+            return
+        if len(self.entries) >= self.capacity:
+            victim = next((k for k in self.entries if k[0] != 'SEVERE'), next(iter(self.entries)))
+            del self.entries[victim]
+            self.dropped += 1
+        self.entries[key] = {**entry, 'count': 1, 'first': entry['timestamp'], 'last': entry['timestamp']}
+
+    def to_list(self):
+        return [{k: v for k, v in e.items() if k != 'timestamp'} for e in self.entries.values()]
+
+
+class ConsoleLog:
+    """Collects browser log entries for the whole run, sliced per test."""
+
+    def __init__(self, driver, capacity=CAPACITY, interval=POLL_INTERVAL):
+        self.driver = driver
+        self.capacity = capacity
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.current = _Buffer(capacity)
+        self.session_errors = _Buffer(SESSION_CAPACITY)
+        self.request_urls = collections.OrderedDict()
+        self._subscriptions = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Begin collecting (event subscriptions or a polling thread)."""
+        if hasattr(self.driver, 'subscribe'):
+            from execution.qa import cdp_driver
+            self._subscribe('Runtime.consoleAPICalled', lambda p: self.add(cdp_driver.console_entry(p)))
+            self._subscribe('Runtime.exceptionThrown', lambda p: self.add(cdp_driver.exception_entry(p)))
+            self._subscribe('Log.entryAdded', self._on_log_entry)
+            self._subscribe('Network.requestWillBeSent', self._on_request)
+            self._subscribe('Network.loadingFailed', self._on_loading_failed)
+        else:
+            self._thread = threading.Thread(target=self._poll, name='console-log', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop collecting; pending Selenium entries are drained first."""
+        for event, callback in self._subscriptions:
+            try:
+                self.driver.unsubscribe(event, callback)
+            except Exception:
+                pass
+        self._subscriptions = []
+        if self._thread:
+            self._stop.set()
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+            self.drain()
+
+    def _subscribe(self, event, callback):
+        self.driver.subscribe(event, callback)
+        self._subscriptions.append((event, callback))
+
+    # Sources
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def drain(self):
+        """Pull buffered entries from the driver (Selenium backend)."""
+        with self.lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        # Callers hold self.lock, so the poll thread cannot file entries
+        # under a test that begin()/end() has already switched away from
+        if self._subscriptions:
+            return
+        try:
+            entries = self.driver.get_log('browser')
+        except Exception:
+            return  # session gone or logging unsupported
+        for entry in entries:
+            self._add_locked(self._normalize(entry))
+
+    def _on_log_entry(self, params):
+        from execution.qa import cdp_driver
+        entry = cdp_driver.log_entry(params)
+        if 'Failed to load resource: net::' in entry['message']:
+            return  # reported with its url by Network.loadingFailed
+        self.add(entry)
+
+    def _on_request(self, params):
+        with self.lock:
+            self.request_urls[params.get('requestId')] = params.get('request', {}).get('url', '')
+            while len(self.request_urls) > REQUEST_URLS:
+                self.request_urls.popitem(last=False)
+
+    def _on_loading_failed(self, params):
+        if params.get('canceled'):
+            return
+        with self.lock:
+            url = self.request_urls.pop(params.get('requestId'), '')
+        reason = params.get('blockedReason') or params.get('errorText', 'failed')
+        self.add({'level': 'SEVERE', 'message': f"{url} {reason}".strip(), 'source': 'network',
+                  'timestamp': int(time.time() * 1000)})
+
+    # Buffers
+
+    @staticmethod
+    def _normalize(entry):
+        return {
+            'level': entry.get('level', 'INFO'),
+            'source': entry.get('source', 'other'),
+            'message': str(entry.get('message', ''))[:MESSAGE_LIMIT],
+            'timestamp': entry.get('timestamp') or int(time.time() * 1000),
+        }
+
+    def _add_locked(self, entry):
+        self.current.add(entry)
+        if entry['level'] == 'SEVERE':
+            self.session_errors.add(entry)
+
+    def add(self, entry):
+        """File one Selenium-style log entry under the current test."""
+        entry = self._normalize(entry)
+        with self.lock:
+            self._add_locked(entry)
+
+    def begin(self):
+        """Start a fresh buffer for the next test (entries logged between tests only count for the run)."""
+        with self.lock:
+            self._drain_locked()
+            self.current = _Buffer(self.capacity)
+
+    def end(self) -> dict:
+        """
+        Slice for the test that just finished.
+
+        Returns:
+            Dict with entries (deduplicated, with counts), error count and
+            the number of distinct messages evicted, or None if nothing was logged
+        """
+        with self.lock:
+            self._drain_locked()
+            buffer = self.current
+            self.current = _Buffer(self.capacity)
+        if not buffer.entries:
+            return None
+        return {
+            'errors': buffer.errors,
+            'dropped': buffer.dropped,
+            'entries': buffer.to_list(),
+        }
+
+    def errors(self) -> list:
+        """Distinct SEVERE entries seen so far in the run, with counts."""
+        with self.lock:
+            self._drain_locked()
+            return self.session_errors.to_list()
@@ -0,0 +1,181 @@
+"""
+QA report history.
+Reads past qa_report_*.json files (durations for shard weighting, last
+failures), computes the build/test fingerprints stored in report metadata
+and merges per-shard reports into a single report.
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+APP_DIR = ROOT_DIR / 'farm-app'
+
+# farm-app inputs that change what the browser runs
+APP_BUILD_INPUTS = [
+    'src',
+    'public',
+    'index.html',
+    'package.json',
+    'package-lock.json',
+    'vite.config.js',
+    'tailwind.config.js',
+]
+
+
+def list_reports(output_dir: str) -> list:
+    """Return qa_report_*.json paths in output_dir, oldest first."""
+    paths = glob.glob(os.path.join(output_dir, "qa_report_*.json"))
+    return sorted(paths, key=lambda p: (os.path.getmtime(p), p))
+
+
+def load_report(path: str) -> dict:
+    """Load a report file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def latest_report(output_dir: str):
+    """Return the most recent report dict in output_dir, or None."""
+    for path in reversed(list_reports(output_dir)):
+        try:
+            return load_report(path)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def summarize(tests: list) -> dict:
+    """Build the report summary block from a list of test dicts."""
+    passed = sum(1 for t in tests if t.get("passed"))
+    failed = len(tests) - passed
+    return {
+        "total": len(tests),
+        "passed": passed,
+        "failed": failed,
+        "skipped": sum(1 for t in tests if t.get("skipped")),
+        "pass_rate": f"{(passed/len(tests)*100):.1f}%" if tests else "N/A"
+    }
+
+
+def build_hash(app_dir: Path = APP_DIR) -> str:
+    """Content hash of the farm-app sources and build config."""
+    digest = hashlib.sha256()
+    files = []
+    for entry in APP_BUILD_INPUTS:
+        path = app_dir / entry
+        if path.is_dir():
+            files.extend(p for p in path.rglob('*') if p.is_file())
+        elif path.is_file():
+            files.append(path)
+
+    for path in sorted(files):
+        digest.update(path.relative_to(app_dir).as_posix().encode())
+        digest.update(b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def module_hash(module) -> str:
+    """Content hash of a test module's source file."""
+    with open(inspect.getsourcefile(module), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def report_durations(report: dict) -> dict:
+    """Duration per test name in one report dict (empty for None)."""
+    if not report:
+        return {}
+    return {test["name"]: float(test.get("duration", 0))
+            for test in report.get("tests", []) if test.get("name") and not test.get("skipped")}
+
+
+def load_durations(source: str, limit: int = 5) -> dict:
+    """
+    Mean duration per test name from recent reports.
+
+    Args:
+        source: A report directory, or a single report file (e.g. a merged
+                report shared between CI runners so every shard sees the
+                same weights)
+        limit: Number of most recent reports to average over
+
+    Returns:
+        Dict of full test name -> mean duration in seconds
+    """
+    if os.path.isfile(source):
+        paths = [source]
+    elif os.path.isdir(source):
+        paths = list_reports(source)[-limit:]
+    else:
+        return {}
+
+    totals = {}
+    counts = {}
+    for path in paths:
+        try:
+            report = load_report(path)
+        except (OSError, ValueError):
+            continue
+        for test in report.get("tests", []):
+            name = test.get("name")
+            if not name or test.get("skipped"):
+                continue
+            totals[name] = totals.get(name, 0) + float(test.get("duration", 0))
+            counts[name] = counts.get(name, 0) + 1
+
+    return {name: round(totals[name] / counts[name], 2) for name in totals}
+
+
+def merge_reports(paths: list) -> dict:
+    """
+    Combine per-shard reports into one report.
+
+    Tests are kept in shard order. If the same test appears in more than one
+    report, the one from the later report wins.
+    """
+    tests = {}
+    sources = []
+    shards = []
+    timestamps = []
+    build_hashes = set()
+    test_hashes = {}
+
+    for path in paths:
+        report = load_report(path)
+        sources.append(os.path.basename(path))
+        timestamps.append(report.get("timestamp", ""))
+        metadata = report.get("metadata", {})
+        if metadata.get("shard"):
+            shards.append(metadata["shard"])
+        build_hashes.add(metadata.get("build_hash"))
+        test_hashes.update(metadata.get("test_hashes", {}))
+        for test in report.get("tests", []):
+            if test["name"] in tests:
+                print(f"⚠️ {test['name']} found in several reports, keeping {os.path.basename(path)}")
+                del tests[test["name"]]
+            tests[test["name"]] = test
+
+    metadata = {
+        "merged_from": sources,
+        "shards": shards,
+    }
+    # Fingerprints only carry over when every shard tested the same build
+    if len(build_hashes) == 1 and None not in build_hashes:
+        metadata["build_hash"] = build_hashes.pop()
+        metadata["test_hashes"] = test_hashes
+
+    merged_tests = list(tests.values())
+    return {
+        "timestamp": max(timestamps) if timestamps else "",
+        "summary": summarize(merged_tests),
+        "metadata": metadata,
+        "tests": merged_tests
+    }
@@ -0,0 +1,327 @@
+"""
+Migrate embedded arrays into subcollections.
+Copies employees.payments, batches.animals and animals[].weightHistory into
+subcollections with chunked, throttled batched writes. Progress is
+checkpointed after every page of parent documents so an interrupted run
+resumes where it stopped, and document counts are verified afterwards.
+
+The embedded arrays are left in place: the app still reads them, so they
+can only be removed once DataContext reads the subcollections.
+
+Usage:
+    python migrate_subcollections.py run payments --dry-run      # Plan only
+    python migrate_subcollections.py run all --qa --emulator     # qa_* on the local emulator
+    python migrate_subcollections.py run animals --rate 100      # At most 100 writes/s
+    python migrate_subcollections.py run weightHistory --restart # Ignore the checkpoint
+    python migrate_subcollections.py verify payments
+    python migrate_subcollections.py status
+
+Target layout:
+    employees/{id}/payments/{paymentId}
+    batches/{id}/animals/{animalId}                  (without weightHistory)
+    batches/{id}/animals/{animalId}/weightHistory/{position}
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from execution.qa.test_data import (
+    get_firestore_client,
+    collection_name,
+    bulk_write,
+    start_emulator,
+    WRITE_BATCH_SIZE,
+    DEFAULT_EMULATOR_HOST,
+)
+
+CHECKPOINT_DIR = Path(__file__).parent.parent.parent / '.tmp' / 'migrations'
+
+PAGE_SIZE = 50           # parent documents read per page (one checkpoint per page)
+DEFAULT_RATE = 200       # writes per second
+
+
+def _doc_id(value, index):
+    """Subcollection document id from an element id (falls back to position)."""
+    if value in (None, ''):
+        return f"{index:05d}"
+    return str(value).replace('/', '_')
+
+
+def _payment_docs(data):
+    for i, payment in enumerate(data.get('payments') or []):
+        yield ('payments', _doc_id(payment.get('id'), i)), payment
+
+
+def _animal_docs(data):
+    for i, animal in enumerate(data.get('animals') or []):
+        row = {k: v for k, v in animal.items() if k != 'weightHistory'}
+        yield ('animals', _doc_id(animal.get('id'), i)), row
+
+
+def _weight_docs(data):
+    for i, animal in enumerate(data.get('animals') or []):
+        animal_id = _doc_id(animal.get('id'), i)
+        for j, record in enumerate(animal.get('weightHistory') or []):
+            # Keyed by position: several records can share a date
+            yield ('animals', animal_id, 'weightHistory', _doc_id(None, j)), record
+
+
+# name -> (parent collection, element extractor)
+MIGRATIONS = {
+    'payments': ('employees', _payment_docs),
+    'animals': ('batches', _animal_docs),
+    'weightHistory': ('batches', _weight_docs),
+}
+
+
+class RateLimiter:
+    """Token bucket limiting writes per second across threads."""
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count: int = 1):
+        """Block until count writes may be issued."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # A request bigger than the bucket goes through once it is full
+                if self.tokens >= min(count, self.rate):
+                    self.tokens -= count
+                    return
+                missing = min(count, self.rate) - self.tokens
+            time.sleep(missing / self.rate)
+
+
+def _target_ref(parent_ref, path):
+    ref = parent_ref
+    for sub, doc_id in zip(path[0::2], path[1::2]):
+        ref = ref.collection(sub).document(doc_id)
+    return ref
+
+
+def checkpoint_target(db):
+    """Database a migration writes to: the emulator host, or the Firebase project id."""
+    host = os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if host:
+        return f"emulator-{host}"
+    return getattr(db, 'project', None) or 'default'
+
+
+def _checkpoint_path(name, qa, target):
+    safe_target = re.sub(r'[^A-Za-z0-9._-]', '_', target)
+    return CHECKPOINT_DIR / f"{name}{'_qa' if qa else ''}_{safe_target}.json"
+
+
+def read_checkpoint(name, qa=False, target='default'):
+    """Return the checkpoint dict for a migration against one database, or None."""
+    try:
+        with open(_checkpoint_path(name, qa, target)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_checkpoint(name, qa, target, state):
+    path = _checkpoint_path(name, qa, target)
+    os.makedirs(path.parent, exist_ok=True)
+    state['updated'] = datetime.now().isoformat()
+    tmp_path = str(path) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _parent_pages(db, collection, after=None, page_size=PAGE_SIZE):
+    """Yield pages of parent snapshots ordered by document id, starting after an id."""
+    last = db.collection(collection).document(after).get() if after else None
+    while True:
+        query = db.collection(collection).order_by('__name__').limit(page_size)
+        if last is not None:
+            query = query.start_after(last)
+        page = list(query.stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def migrate(name, qa=False, dry_run=False, rate=DEFAULT_RATE, restart=False):
+    """
+    Copy one embedded array into subcollections.
+
+    Writes are idempotent (deterministic ids), so a page that was partly
+    written before an interruption is simply written again on resume.
+
+    Returns:
+        True if the migration completed and verified
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    collection, extract = MIGRATIONS[name]
+    collection = collection_name(collection, qa)
+    target = checkpoint_target(db)
+
+    state = None if (restart or dry_run) else read_checkpoint(name, qa, target)
+    if state and state.get('completed'):
+        print(f"[MIGRATE] {name}: already completed {state['updated']} (use --restart to run again)")
+        return verify(name, qa)
+    if state:
+        print(f"[MIGRATE] {name}: resuming after {collection}/{state['last_parent']} "
+              f"({state['parents']} parents, {state['written']} writes done)")
+    else:
+        state = {'migration': name, 'collection': collection, 'target': target, 'last_parent': None,
+                 'parents': 0, 'written': 0, 'completed': False, 'started': datetime.now().isoformat()}
+
+    limiter = RateLimiter(rate)
+    mode = ' (dry run)' if dry_run else f" at {rate} writes/s"
+    print(f"[MIGRATE] {name}: {collection} -> subcollections on {target}{mode}")
+    started = time.time()
+
+    for page in _parent_pages(db, collection, after=state['last_parent']):
+        operations = []
+        for snapshot in page:
+            for path, data in extract(snapshot.to_dict() or {}):
+                operations.append(('set', _target_ref(snapshot.reference, path), data))
+
+        if not dry_run:
+            # Throttle per batched write so the limiter paces the commits
+            for start in range(0, len(operations), WRITE_BATCH_SIZE):
+                chunk = operations[start:start + WRITE_BATCH_SIZE]
+                limiter.acquire(len(chunk))
+                bulk_write(db, chunk, workers=1)
+
+        state['parents'] += len(page)
+        state['written'] += len(operations)
+        state['last_parent'] = page[-1].id
+        if not dry_run:
+            _write_checkpoint(name, qa, target, state)
+        print(f"  {state['parents']} parents, {state['written']} {'planned' if dry_run else 'written'}")
+
+    elapsed = time.time() - started
+    if dry_run:
+        print(f"[MIGRATE] {name}: {state['written']} writes planned for {state['parents']} parents")
+        return True
+
+    state['completed'] = True
+    _write_checkpoint(name, qa, target, state)
+    print(f"[MIGRATE] {name}: {state['written']} writes in {elapsed:.1f}s")
+    return verify(name, qa)
+
+
+def verify(name, qa=False):
+    """
+    Compare each parent's embedded elements with its subcollection documents.
+
+    Every element is counted, so elements that share an id (and overwrote
+    each other's document) show up as missing documents.
+
+    Returns:
+        True if every subcollection has the expected number of documents
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+
+    collection, extract = MIGRATIONS[name]
+    collection = collection_name(collection, qa)
+    expected_total = 0
+    actual_total = 0
+    mismatches = []
+
+    for page in _parent_pages(db, collection):
+        for snapshot in page:
+            expected = {}
+            for path, _ in extract(snapshot.to_dict() or {}):
+                expected[path[:-1]] = expected.get(path[:-1], 0) + 1
+            for sub_path, count in expected.items():
+                parent = _target_ref(snapshot.reference, sub_path[:-1])
+                actual = sum(1 for _ in parent.collection(sub_path[-1]).select([]).stream())
+                expected_total += count
+                actual_total += actual
+                if actual != count:
+                    mismatches.append((f"{parent.path}/{sub_path[-1]}", count, actual))
+
+    for path, expected, actual in mismatches[:20]:
+        print(f"  ❌ {path}: expected {expected}, found {actual}")
+    if len(mismatches) > 20:
+        print(f"  ... {len(mismatches) - 20} more")
+
+    if mismatches:
+        print(f"[MIGRATE] {name}: verification failed, {len(mismatches)} subcollection(s) differ "
+              f"({actual_total}/{expected_total} documents)")
+        return False
+    print(f"[MIGRATE] {name}: verified {actual_total} documents")
+    return True
+
+
+def status():
+    """Print the checkpoint of every migration, per target database."""
+    for path in sorted(CHECKPOINT_DIR.glob('*.json')):
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        progress = 'completed' if state.get('completed') else f"stopped after {state['last_parent']}"
+        print(f"  {state['migration']:<14} {state['collection']:<14} {state.get('target', '?'):<24} "
+              f"{progress:<28} {state['parents']} parents, {state['written']} writes ({state['updated']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Farm TNF embedded array -> subcollection migration")
+    parser.add_argument("command", choices=["run", "verify", "status"])
+    parser.add_argument("migration", nargs="?", choices=[*MIGRATIONS, "all"], default="all")
+    parser.add_argument("--qa", action="store_true", help="Migrate qa_* collections")
+    parser.add_argument("--emulator", nargs="?", const=DEFAULT_EMULATOR_HOST, metavar="HOST",
+                        help="Run against the Firestore emulator (starts it if needed)")
+    parser.add_argument("--dry-run", action="store_true", help="Count writes without writing")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Maximum writes per second")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        status()
+        return 0
+
+    process = None
+    if args.emulator:
+        host, process = start_emulator(args.emulator)
+        if not host:
+            return 1
+
+    names = list(MIGRATIONS) if args.migration == "all" else [args.migration]
+    ok = True
+    try:
+        for name in names:
+            if args.command == "run":
+                ok = migrate(name, qa=args.qa, dry_run=args.dry_run, rate=args.rate, restart=args.restart) and ok
+            else:
+                ok = verify(name, qa=args.qa) and ok
+    finally:
+        if process:
+            process.terminate()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
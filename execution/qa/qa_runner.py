@@ -6,30 +6,235 @@ Usage:
     python qa_runner.py                    # Run all tests
     python qa_runner.py --suite livestock  # Run specific suite
     python qa_runner.py --url http://localhost:3000/
+    python qa_runner.py --daemon           # Reuse warm browser from browser_daemon.py
+    python qa_runner.py --driver cdp       # Drive Chrome over DevTools instead of chromedriver
+    python qa_runner.py --watch            # Re-run impacted suites on save
+    python qa_runner.py --shard 2/3        # Run the 2nd of 3 CI shards
+    python qa_runner.py merge shard_reports/*.json --output .tmp
+    python qa_runner.py --last-failed      # Only tests that failed last run (+ prerequisites)
+    python qa_runner.py --skip-unchanged   # Skip passed tests if app + test code unchanged
+    python qa_runner.py --emulator --setup-data  # Offline run against the Firestore emulator
+    python qa_runner.py --benchmark --emulator   # Page latency vs. farm size sweep
+    python qa_runner.py --benchmark --sizes 10,100,1000 --repeats 5
 """
 
 import argparse
 import json
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from execution.qa.browser_utils import BrowserHelper, run_test
+from execution.qa.browser_utils import BrowserHelper, TestResult, run_test
+from execution.qa import history
 from execution.qa.tests import test_livestock, test_navigation
 
 
+# Suite name -> test module. Watch mode reloads modules in place here.
+SUITE_MODULES = {
+    "livestock": test_livestock,
+    "navigation": test_navigation,
+}
+
+
 def get_available_suites():
     """Return dict of available test suites."""
+    return {name: module.get_tests() for name, module in SUITE_MODULES.items()}
+
+
+# Weight for tests without recorded history, in seconds
+DEFAULT_TEST_DURATION = 5.0
+
+
+def parse_shard(value: str) -> tuple:
+    """Parse 'i/n' into (i, n), 1-based."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like 1/3, got {value!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}")
+    return index, count
+
+
+def shard_units(suite_name: str, tests: list) -> list:
+    """
+    Split a suite into units that must run on the same shard.
+    
+    A test and its PREREQUISITES (transitively) form one unit; tests
+    without declared dependencies are units of their own.
+    
+    Returns:
+        List of test lists, each in suite order
+    """
+    prerequisites = getattr(SUITE_MODULES[suite_name], "PREREQUISITES", {})
+    names = [name for name, _ in tests]
+    group = {name: name for name in names}
+    
+    def _root(name):
+        while group[name] != name:
+            name = group[name]
+        return name
+    
+    for name, deps in prerequisites.items():
+        for dep in deps:
+            if name in group and dep in group:
+                group[_root(name)] = _root(dep)
+    
+    units = {}
+    for test in tests:
+        units.setdefault(_root(test[0]), []).append(test)
+    return list(units.values())
+
+
+def shard_suites(suites: dict, index: int, count: int, durations: dict) -> dict:
+    """
+    Deterministically pick the tests belonging to one shard.
+    
+    Tests are distributed individually, except that a test always stays on
+    the same shard as its PREREQUISITES (see shard_units). Units are
+    weighted by their test durations and assigned longest-first to the
+    least loaded shard, so every runner computes the same split given the
+    same durations.
+    
+    Args:
+        suites: Dict of suite name -> tests
+        index: 1-based shard index
+        count: Total number of shards
+        durations: Full test name -> seconds (see history.load_durations)
+        
+    Returns:
+        Dict of suite name -> tests for this shard, in original order
+        (suites with no tests on this shard are left out)
+    """
+    units = []
+    for suite_name, tests in suites.items():
+        for unit in shard_units(suite_name, tests):
+            weight = sum(durations.get(f"{suite_name}.{test_name}", DEFAULT_TEST_DURATION)
+                         for test_name, _ in unit)
+            units.append((weight, suite_name, unit))
+    
+    loads = [0.0] * count
+    selected = set()
+    for weight, suite_name, unit in sorted(units, key=lambda u: (-u[0], u[1], u[2][0][0])):
+        target = min(range(count), key=lambda i: (loads[i], i))
+        loads[target] += weight
+        if target == index - 1:
+            selected.update((suite_name, test_name) for test_name, _ in unit)
+    
+    shard = {}
+    for suite_name, tests in suites.items():
+        picked = [test for test in tests if (suite_name, test[0]) in selected]
+        if picked:
+            shard[suite_name] = picked
+    return shard
+
+
+def parse_sizes(value: str) -> list:
+    """Parse '10,100,1000' into a sorted list of dataset sizes."""
+    try:
+        sizes = sorted({int(part) for part in value.split(",") if part.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"sizes must look like 10,100,1000, got {value!r}")
+    if not sizes or sizes[0] < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive")
+    return sizes
+
+
+def run_fingerprints() -> dict:
+    """Build and test-module hashes stored in report metadata."""
     return {
-        "livestock": test_livestock.get_tests(),
-        "navigation": test_navigation.get_tests(),
+        "build_hash": history.build_hash(),
+        "test_hashes": {name: history.module_hash(module) for name, module in SUITE_MODULES.items()},
     }
 
 
+def with_prerequisites(suite_name: str, tests: list, wanted: set) -> list:
+    """
+    Return the wanted tests plus everything they depend on, in suite order.
+    
+    Test modules declare dependencies in a module-level PREREQUISITES dict
+    of test name -> list of test names that must run first.
+    """
+    prerequisites = getattr(SUITE_MODULES[suite_name], "PREREQUISITES", {})
+    needed = set(wanted)
+    pending = list(wanted)
+    while pending:
+        for dep in prerequisites.get(pending.pop(), []):
+            if dep not in needed:
+                needed.add(dep)
+                pending.append(dep)
+    return [(name, fn) for name, fn in tests if name in needed]
+
+
+def plan_reruns(suites: dict, last_report: dict, fingerprints: dict,
+                last_failed: bool, skip_unchanged: bool) -> tuple:
+    """
+    Narrow the suites down using the previous report.
+    
+    Args:
+        suites: Dict of suite name -> tests
+        last_report: Most recent report dict
+        fingerprints: Current run_fingerprints()
+        last_failed: Only keep tests that failed last time
+        skip_unchanged: Drop tests that passed last time when neither the
+                        app build nor the suite's test module changed
+                        
+    Returns:
+        (suites to run, TestResults for tests skipped as unchanged)
+    """
+    last_tests = {t["name"]: t for t in last_report.get("tests", [])}
+    last_meta = last_report.get("metadata", {})
+    build_unchanged = last_meta.get("build_hash") == fingerprints["build_hash"]
+    
+    planned = {}
+    skipped = []
+    for suite_name, tests in suites.items():
+        names = [name for name, _ in tests]
+        if last_failed:
+            wanted = {n for n in names if f"{suite_name}.{n}" in last_tests
+                      and not last_tests[f"{suite_name}.{n}"]["passed"]}
+        else:
+            wanted = set(names)
+            
+        unchanged = set()
+        suite_unchanged = (build_unchanged and
+                           last_meta.get("test_hashes", {}).get(suite_name) == fingerprints["test_hashes"][suite_name])
+        if skip_unchanged and suite_unchanged:
+            unchanged = {n for n in names if last_tests.get(f"{suite_name}.{n}", {}).get("passed")}
+            wanted -= unchanged
+            
+        selected = with_prerequisites(suite_name, tests, wanted) if wanted else []
+        if selected:
+            planned[suite_name] = selected
+            
+        selected_names = {name for name, _ in selected}
+        for name in names:
+            if not last_failed and name in unchanged and name not in selected_names:
+                result = TestResult(f"{suite_name}.{name}")
+                result.passed = True
+                result.skipped = True
+                result.details = {"reason": "passed last run, build and test module unchanged"}
+                skipped.append(result)
+                
+    return planned, skipped
+
+
+def reset_emulator_data(setup_data: bool, suite_name: str):
+    """Clear the emulator database (and seed the suite's fixtures if requested)."""
+    from execution.qa import test_data
+    
+    start = time.time()
+    test_data.reset_emulator()
+    if setup_data:
+        test_data.setup_test_data([suite_name])
+    print(f"   🔄 Emulator reset in {time.time() - start:.2f}s")
+
+
 def run_suite(browser: BrowserHelper, suite_name: str, tests: list) -> list:
     """Run all tests in a suite."""
     print(f"\n{'='*50}")
@@ -54,25 +259,23 @@ def run_suite(browser: BrowserHelper, suite_name: str, tests: list) -> list:
     return results
 
 
-def generate_report(results: list, output_dir: str) -> str:
+def generate_report(results: list, output_dir: str, metadata: dict = None) -> str:
     """Generate JSON report and return path."""
     os.makedirs(output_dir, exist_ok=True)
+    metadata = metadata or {}
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_path = os.path.join(output_dir, f"qa_report_{timestamp}.json")
-    
-    passed = sum(1 for r in results if r.passed)
-    failed = len(results) - passed
+    suffix = ""
+    if metadata.get("shard"):
+        suffix = "_shard" + metadata["shard"].replace("/", "of")
+    report_path = os.path.join(output_dir, f"qa_report_{timestamp}{suffix}.json")
     
+    tests = [r.to_dict() for r in results]
     report = {
         "timestamp": datetime.now().isoformat(),
-        "summary": {
-            "total": len(results),
-            "passed": passed,
-            "failed": failed,
-            "pass_rate": f"{(passed/len(results)*100):.1f}%" if results else "N/A"
-        },
-        "tests": [r.to_dict() for r in results]
+        "summary": history.summarize(tests),
+        "metadata": metadata,
+        "tests": tests
     }
     
     with open(report_path, 'w') as f:
@@ -81,10 +284,36 @@ def generate_report(results: list, output_dir: str) -> str:
     return report_path
 
 
+def merge_main(argv: list) -> int:
+    """Merge per-shard reports: qa_runner.py merge <report>... [--output DIR]"""
+    parser = argparse.ArgumentParser(prog="qa_runner.py merge", description="Merge per-shard QA reports")
+    parser.add_argument("reports", nargs="+", help="qa_report_*.json files to merge")
+    parser.add_argument("--output", default=".tmp", help="Output directory for the merged report")
+    args = parser.parse_args(argv)
+    
+    report = history.merge_reports(args.reports)
+    
+    os.makedirs(args.output, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Not qa_report_*: merged reports must not count as a local run (history.list_reports)
+    report_path = os.path.join(args.output, f"qa_merged_{timestamp}.json")
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    summary = report["summary"]
+    print(f"📄 Merged {len(args.reports)} reports: {report_path}")
+    print(f"  Total:  {summary['total']}")
+    print(f"  Passed: {summary['passed']} ✅")
+    print(f"  Failed: {summary['failed']} ❌")
+    print(f"  Pass Rate: {summary['pass_rate']}")
+    return 1 if summary["failed"] > 0 else 0
+
+
 def print_summary(results: list):
     """Print test summary to console."""
     passed = sum(1 for r in results if r.passed)
     failed = len(results) - passed
+    skipped = sum(1 for r in results if r.skipped)
     
     print(f"\n{'='*50}")
     print("TEST SUMMARY")
@@ -92,6 +321,8 @@ def print_summary(results: list):
     print(f"  Total:  {len(results)}")
     print(f"  Passed: {passed} ✅")
     print(f"  Failed: {failed} ❌")
+    if skipped:
+        print(f"  Skipped (unchanged): {skipped} ⏭️")
     if results:
         print(f"  Pass Rate: {(passed/len(results)*100):.1f}%")
         
@@ -102,14 +333,82 @@ def print_summary(results: list):
                 print(f"    - {r.name}: {r.error}")
 
 
+def watch_loop(browser: BrowserHelper, app_url: str, test_url: str, suite_names: list, output_dir: str) -> int:
+    """Re-run impacted suites whenever app sources or test modules change."""
+    from execution.qa import watch
+    
+    watcher = watch.FileWatcher([watch.APP_SRC_DIR, watch.TESTS_DIR])
+    if not watcher.start():
+        return 1
+    
+    watched = {name: SUITE_MODULES[name] for name in suite_names}
+    print(f"\n👀 Watching {watch.APP_SRC_DIR} and {watch.TESTS_DIR} (Ctrl+C to stop)")
+    
+    try:
+        while True:
+            changed = watcher.wait_for_changes()
+            suites, reload, unmapped = watch.impacted_suites(changed, watched)
+            
+            print(f"\n🔄 Changed: {', '.join(p.name for p in changed)}")
+            if unmapped:
+                print(f"   No suite declares {', '.join(unmapped)} - re-running all watched suites")
+            if not suites:
+                print("   No watched suites cover these files")
+                continue
+            
+            failed_reload = watch.reload_suites(watched, reload)
+            SUITE_MODULES.update(watched)
+            
+            compile_errors = watch.wait_for_hmr(browser, app_url, changed)
+            if compile_errors:
+                for path, error in compile_errors:
+                    print(f"   ❌ Vite could not compile {path}: {error}")
+                continue
+            
+            # Start from the app's landing page, like a fresh run
+            browser.reset_state(test_url)
+            
+            results = []
+            for suite_name in suites:
+                if suite_name in failed_reload:
+                    continue
+                results.extend(run_suite(browser, suite_name, watched[suite_name].get_tests()))
+                
+            report_path = generate_report(results, output_dir, run_fingerprints())
+            print_summary(results)
+            print(f"\n📄 Report saved: {report_path}")
+            print(f"👀 Waiting for changes...")
+    except KeyboardInterrupt:
+        print("\n👋 Watch mode stopped")
+        return 0
+    finally:
+        watcher.stop()
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        return merge_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(description="Farm TNF QA Test Runner")
     parser.add_argument("--url", default="http://localhost:5173/", help="App URL to test")
     parser.add_argument("--suite", default="all", help="Test suite to run (livestock, navigation, all)")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--output", default=".tmp", help="Output directory for reports")
-    parser.add_argument("--setup-data", action="store_true", help="Setup test data before running tests")
+    parser.add_argument("--setup-data", action="store_true", help="Seed the fixtures the selected suites need before running tests")
     parser.add_argument("--cleanup", action="store_true", help="Cleanup test data after running tests")
+    parser.add_argument("--daemon", action="store_true", help="Attach to the warm browser daemon (started if needed)")
+    parser.add_argument("--watch", action="store_true", help="Keep the browser open and re-run impacted suites on save")
+    parser.add_argument("--shard", type=parse_shard, help="Run one shard of the suites, e.g. 1/3")
+    parser.add_argument("--durations", help="Shared report file (e.g. the last merged report) whose durations weight the shards (default: the newest report in --output)")
+    parser.add_argument("--last-failed", action="store_true", help="Only run tests that failed in the latest report, plus their prerequisites")
+    parser.add_argument("--skip-unchanged", action="store_true", help="Skip tests that passed last run if farm-app and the test module are unchanged")
+    parser.add_argument("--emulator", action="store_true", help="Use a local Firestore emulator (started if needed), reset between suites")
+    parser.add_argument("--emulator-host", help="Emulator host:port (default: FIRESTORE_EMULATOR_HOST or 127.0.0.1:8080)")
+    parser.add_argument("--benchmark", action="store_true", help="Measure page latency at increasing seeded farm sizes instead of running suites (replaces qa_* data)")
+    parser.add_argument("--sizes", type=parse_sizes, default="10,100,1000,10000", help="Animal counts for --benchmark (default: 10,100,1000,10000)")
+    parser.add_argument("--repeats", type=int, default=3, help="Page loads per size for --benchmark (median is reported)")
+    parser.add_argument("--driver", choices=["selenium", "cdp"], default="selenium", help="Browser backend: chromedriver or direct DevTools protocol")
+    parser.add_argument("--resource-interval", type=float, default=0.5, help="Seconds between CPU/RSS/shm samples attached to each test (0 disables)")
     
     args = parser.parse_args()
     
@@ -117,33 +416,66 @@ def main():
     print(f"   URL: {args.url}")
     print(f"   Suite: {args.suite}")
     print(f"   Headless: {args.headless}")
+    if args.daemon:
+        print(f"   Browser: daemon")
+    elif args.driver != "selenium":
+        print(f"   Driver: {args.driver}")
+    if args.daemon and args.driver == "cdp":
+        print("❌ --daemon keeps a chromedriver session and cannot be combined with --driver cdp")
+        return 1
     
-    # Setup test data if requested
-    if args.setup_data:
-        print(f"\n📦 Setting up test data...")
-        try:
-            from execution.qa.test_data import setup_test_data
-            if not setup_test_data():
-                print("⚠️ Test data setup failed, continuing anyway...")
-        except ImportError as e:
-            print(f"⚠️ Could not import test_data module: {e}")
-            print("   Make sure firebase-admin is installed: pip install firebase-admin")
+    emulator_host = None
+    emulator_process = None
+    if args.emulator:
+        print(f"\n🔌 Connecting to Firestore emulator...")
+        from execution.qa import test_data
+        emulator_host, emulator_process = test_data.start_emulator(args.emulator_host)
+        if not emulator_host:
+            return 1
+    
+    # Add qa_test parameter to bypass authentication
+    test_url = args.url
+    if '?' in test_url:
+        test_url += '&qa_test=true'
+    else:
+        test_url += '?qa_test=true'
+    if emulator_host:
+        test_url += f'&qa_emulator={emulator_host}'
     
     # Initialize browser
-    browser = BrowserHelper(headless=args.headless)
+    browser = BrowserHelper(headless=args.headless, backend=args.driver)
+    
+    monitor = None
+    if args.resource_interval > 0:
+        from execution.qa.resources import ResourceMonitor
+        monitor = ResourceMonitor(args.url, interval=args.resource_interval).start()
     
     try:
-        browser.start()
-        
-        # Add qa_test parameter to bypass authentication
-        test_url = args.url
-        if '?' in test_url:
-            test_url += '&qa_test=true'
+        if args.daemon:
+            from execution.qa import browser_daemon
+            attached = browser_daemon.attach(test_url, headless=args.headless)
+            if not attached:
+                print("❌ Could not attach to browser daemon")
+                return 1
+            browser = attached
+            if monitor:
+                monitor.extra_pids.append((browser_daemon.read_state() or {}).get('pid'))
+            print(f"   Test URL: {test_url}")
         else:
-            test_url += '?qa_test=true'
+            browser.start()
+            print(f"   Test URL: {test_url}")
+            browser.navigate(test_url)
+        
+        if args.benchmark:
+            from execution.qa import benchmark
+            report_path = benchmark.run_benchmark(browser, test_url, args.sizes, args.output, repeats=args.repeats)
+            if not report_path:
+                return 1
+            print(f"\n📄 Benchmark saved: {report_path}")
+            return 0
         
-        print(f"   Test URL: {test_url}")
-        browser.navigate(test_url)
+        browser.start_console_log()
+        browser.resource_monitor = monitor
         
         # Get test suites to run
         available = get_available_suites()
@@ -156,19 +488,68 @@ def main():
             print(f"❌ Unknown suite: {args.suite}")
             print(f"   Available: {', '.join(available.keys())}")
             return 1
+        
+        metadata = {}
+        if args.shard:
+            index, count = args.shard
+            if args.durations:
+                durations, weights = history.load_durations(args.durations), args.durations
+            else:
+                durations = history.report_durations(history.latest_report(args.output))
+                weights = "last report" if durations else f"{DEFAULT_TEST_DURATION:.0f}s per test"
+            total = sum(len(tests) for tests in suites_to_run.values())
+            suites_to_run = shard_suites(suites_to_run, index, count, durations)
+            metadata["shard"] = f"{index}/{count}"
+            selected = sum(len(tests) for tests in suites_to_run.values())
+            print(f"   Shard {index}/{count}: {selected} of {total} tests "
+                  f"({', '.join(suites_to_run) or 'no suites'}; weights: {weights})")
+            if not selected:
+                print(f"⚠️ Shard {index}/{count} is empty - {total} tests cannot fill {count} shards")
+        
+        metadata.update(run_fingerprints())
+        skipped_results = []
+        if args.last_failed or args.skip_unchanged:
+            last_report = history.latest_report(args.output)
+            if not last_report:
+                print(f"   No previous report in {args.output}, running everything")
+            else:
+                suites_to_run, skipped_results = plan_reruns(
+                    suites_to_run, last_report, metadata, args.last_failed, args.skip_unchanged)
+                selected = sum(len(tests) for tests in suites_to_run.values())
+                print(f"   Selected from last report: {selected} to run, {len(skipped_results)} skipped")
             
+        # Setup fixtures for the selected suites (emulator runs seed before every suite)
+        if args.setup_data and not args.emulator:
+            print(f"\n📦 Setting up test data...")
+            try:
+                from execution.qa.test_data import setup_test_data
+                if not setup_test_data(list(suites_to_run)):
+                    print("⚠️ Test data setup failed, continuing anyway...")
+            except ImportError as e:
+                print(f"⚠️ Could not import test_data module: {e}")
+                print("   Make sure firebase-admin is installed: pip install firebase-admin")
+        
         # Run tests
-        all_results = []
+        all_results = list(skipped_results)
         for suite_name, tests in suites_to_run.items():
+            if args.emulator:
+                reset_emulator_data(args.setup_data, suite_name)
             results = run_suite(browser, suite_name, tests)
             all_results.extend(results)
             
         # Generate report
-        report_path = generate_report(all_results, args.output)
+        if monitor:
+            metadata["resources"] = monitor.summary()
+        report_path = generate_report(all_results, args.output, metadata)
         print(f"\n📄 Report saved: {report_path}")
         
         # Print summary
         print_summary(all_results)
+        if monitor:
+            monitor.print_summary()
+        
+        if args.watch:
+            return watch_loop(browser, args.url, test_url, list(suites_to_run), args.output)
         
         # Return exit code
         failed = sum(1 for r in all_results if not r.passed)
@@ -180,6 +561,8 @@ def main():
         
     finally:
         browser.stop()
+        if monitor:
+            monitor.stop()
         
         # Cleanup test data if requested
         if args.cleanup:
@@ -189,6 +572,9 @@ def main():
                 cleanup_test_data()
             except ImportError as e:
                 print(f"⚠️ Could not import test_data module: {e}")
+        
+        if emulator_process:
+            emulator_process.terminate()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+"""
+Resource monitor for QA runs.
+Samples CPU and RSS of everything a run depends on at a fixed interval -
+the Python harness, chromedriver, Chrome's browser/renderer/GPU/utility
+processes, the browser daemon and the Vite dev server - plus /dev/shm usage
+(BrowserHelper starts Chrome with --disable-dev-shm-usage, so shared memory
+pressure shows up there first on CI machines).
+
+Per-test peak/mean values are attached to each result, and a run summary
+goes into the report metadata.
+
+Requires: pip install psutil (monitoring is skipped without it)
+"""
+
+import os
+import shutil
+import threading
+from urllib.parse import urlsplit
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_INTERVAL = 0.5   # seconds
+SHM_PATH = '/dev/shm'
+MB = 1024 * 1024
+
+# Order matters: the first match names the process
+CHROME_TYPES = {
+    '--type=renderer': 'chrome_renderer',
+    '--type=gpu-process': 'chrome_gpu',
+    '--type=utility': 'chrome_utility',
+    '--type=': 'chrome_other',
+}
+
+
+def classify(proc, harness_pid: int, vite_pids: set) -> str:
+    """Category of a process for the report."""
+    if proc.pid == harness_pid:
+        return 'python'
+    if proc.pid in vite_pids:
+        return 'vite'
+    try:
+        name = proc.name().lower()
+        cmdline = ' '.join(proc.cmdline())
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 'other'
+    if 'chromedriver' in name:
+        return 'chromedriver'
+    if 'chrome' in name or 'chromium' in name:
+        for flag, category in CHROME_TYPES.items():
+            if flag in cmdline:
+                return category
+        return 'chrome_browser'
+    if 'python' in name:
+        return 'python'
+    return 'other'
+
+
+def vite_pids(app_url: str) -> set:
+    """Pids of the dev server listening on the app URL's port (and its children)."""
+    port = urlsplit(app_url).port or (443 if app_url.startswith('https') else 80)
+    pids = set()
+    try:
+        for conn in psutil.net_connections(kind='tcp'):
+            if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port and conn.pid:
+                pids.add(conn.pid)
+    except (psutil.AccessDenied, OSError):
+        return pids  # listing sockets of other users needs privileges on some systems
+    for pid in list(pids):
+        try:
+            pids.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+        except psutil.NoSuchProcess:
+            pass
+    return pids
+
+
+def shm_used() -> int:
+    """Bytes used in /dev/shm, or None where it does not exist."""
+    if not os.path.isdir(SHM_PATH):
+        return None
+    return shutil.disk_usage(SHM_PATH).used
+
+
+class _Stats:
+    """Running peak/mean per category."""
+
+    def __init__(self):
+        self.samples = 0
+        self.totals = {}
+        self.peaks = {}
+
+    def add(self, sample: dict):
+        self.samples += 1
+        for key, value in sample.items():
+            if value is None:
+                continue
+            self.totals[key] = self.totals.get(key, 0) + value
+            self.peaks[key] = max(self.peaks.get(key, value), value)
+
+    def to_dict(self) -> dict:
+        if not self.samples:
+            return None
+        result = {'samples': self.samples}
+        for key in sorted(self.peaks):
+            scale, unit = (MB, '_mb') if key.endswith(('rss', 'shm')) else (1, '')
+            result[key + unit] = {
+                'peak': round(self.peaks[key] / scale, 1),
+                'mean': round(self.totals[key] / self.samples / scale, 1),
+            }
+        return result
+
+
+class ResourceMonitor:
+    """Background sampler of the QA process tree."""
+
+    def __init__(self, app_url: str = None, interval: float = SAMPLE_INTERVAL, extra_pids: list = None):
+        self.app_url = app_url
+        self.interval = interval
+        self.extra_pids = [p for p in (extra_pids or []) if p]
+        self.harness_pid = os.getpid()
+        self.lock = threading.Lock()
+        self.run = _Stats()
+        self.current = _Stats()
+        self.processes = {}
+        self.vite = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling; returns None when psutil is not installed."""
+        if psutil is None:
+            print("[QA] psutil not installed - resource monitoring disabled (pip install psutil)")
+            return None
+        if self.app_url:
+            self.vite = vite_pids(self.app_url)
+        self.sample()  # primes cpu_percent, whose first reading is always 0
+        self._thread = threading.Thread(target=self._loop, name='resource-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _tree(self) -> list:
+        """Harness, daemon and dev server processes with all their descendants."""
+        roots = [self.harness_pid, *self.extra_pids, *self.vite]
+        pids = set()
+        for pid in roots:
+            if not pid:
+                continue
+            try:
+                root = psutil.Process(pid)
+                pids.add(pid)
+                pids.update(child.pid for child in root.children(recursive=True))
+            except psutil.NoSuchProcess:
+                continue
+        # Reuse Process objects so cpu_percent() measures since the previous sample
+        for pid in list(self.processes):
+            if pid not in pids:
+                del self.processes[pid]
+        for pid in pids:
+            if pid not in self.processes:
+                try:
+                    self.processes[pid] = psutil.Process(pid)
+                except psutil.NoSuchProcess:
+                    continue
+        return list(self.processes.values())
+
+    def sample(self) -> dict:
+        """Take one sample and add it to the run and current test stats."""
+        with self.lock:
+            sample = {}
+            for proc in self._tree():
+                category = classify(proc, self.harness_pid, self.vite)
+                try:
+                    cpu = proc.cpu_percent(None)
+                    rss = proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+                for key in (category, 'total'):
+                    sample[f"{key}_cpu"] = sample.get(f"{key}_cpu", 0) + cpu
+                    sample[f"{key}_rss"] = sample.get(f"{key}_rss", 0) + rss
+            sample['shm'] = shm_used()
+            self.run.add(sample)
+            self.current.add(sample)
+            return sample
+
+    def begin(self):
+        """Start per-test stats."""
+        with self.lock:
+            self.current = _Stats()
+        self.sample()
+
+    def end(self) -> dict:
+        """
+        Peak/mean stats since begin().
+
+        Returns:
+            Dict of <category>_cpu (percent of one core) and <category>_rss_mb
+            / shm_mb, each with peak and mean, or None if nothing was sampled
+        """
+        self.sample()
+        with self.lock:
+            stats, self.current = self.current, _Stats()
+        return stats.to_dict()
+
+    def print_summary(self):
+        """One-line run peaks for the console."""
+        stats = self.summary()
+        parts = [f"{key[:-7]} {value['peak']:.0f} MB" for key, value in stats.items()
+                 if key.endswith('_rss_mb') and key != 'total_rss_mb']
+        line = f"🖥️  Peak RSS {stats.get('total_rss_mb', {}).get('peak', 0):.0f} MB ({', '.join(parts)})"
+        if 'shm_mb' in stats:
+            line += f", /dev/shm {stats['shm_mb']['peak']:.0f} MB"
+        print(line)
+
+    def summary(self) -> dict:
+        """Run-wide stats plus machine size, for the report metadata."""
+        with self.lock:
+            result = self.run.to_dict() or {}
+        result['cpu_count'] = psutil.cpu_count()
+        result['memory_total_mb'] = round(psutil.virtual_memory().total / MB)
+        return result
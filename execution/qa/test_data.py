@@ -3,19 +3,83 @@ Test data setup and cleanup for QA testing.
 Creates sample data in qa_* collections without touching production.
 
 Usage:
-    python test_data.py setup    # Create test data
+    python test_data.py setup    # Create test data (all suites)
+    python test_data.py setup livestock --force  # One suite, rewrite everything
     python test_data.py cleanup  # Remove all qa_* data
+    python test_data.py scale 1000 [expenses]     # Replace qa_* with a generated farm
+    python test_data.py snapshot save <name>     # Archive qa_* collections
+    python test_data.py snapshot restore <name>  # Reset qa_* to an archive
+    python test_data.py snapshot list
+    python test_data.py emulator start  # Run a local Firestore emulator
+    python test_data.py emulator reset  # Clear the whole emulator database
+
+Set FIRESTORE_EMULATOR_HOST (e.g. 127.0.0.1:8080) to run any command
+against the emulator instead of the Firebase project.
 """
 
 import os
 import sys
 import json
+import gzip
+import time
+import base64
+import math
+import random
+import hashlib
+import shutil
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 
 
+APP_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'farm-app')
+
+# Firestore emulator settings (project id matches farm-app/.firebaserc)
+EMULATOR_PROJECT = 'trinetra-farms-tnf'
+DEFAULT_EMULATOR_HOST = '127.0.0.1:8080'
+
+# The app runs unauthenticated in QA mode, so the emulator gets open rules
+# for qa_* collections instead of the production rules.
+EMULATOR_RULES = """rules_version = '2';
+service cloud.firestore {
+  match /databases/{database}/documents {
+    match /{collection}/{document=**} {
+      allow read: if true;
+      allow write: if collection.matches('qa_.*');
+    }
+  }
+}
+"""
+
+_emulator_client = None
+
+
+def _get_emulator_client(host):
+    """Firestore client for the local emulator (no credentials needed)."""
+    global _emulator_client
+    try:
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud import firestore
+    except ImportError:
+        print("[ERROR] firebase-admin not installed. Run: pip install firebase-admin")
+        return None
+    
+    if _emulator_client is None:
+        # The client reads FIRESTORE_EMULATOR_HOST itself
+        os.environ['FIRESTORE_EMULATOR_HOST'] = host
+        _emulator_client = firestore.Client(project=EMULATOR_PROJECT, credentials=AnonymousCredentials())
+    return _emulator_client
+
+
 # Firebase Admin SDK setup
 def get_firestore_client():
-    """Initialize Firestore client using Firebase Admin SDK."""
+    """Initialize Firestore client using Firebase Admin SDK (or the emulator)."""
+    emulator_host = os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if emulator_host:
+        return _get_emulator_client(emulator_host)
+    
     try:
         import firebase_admin
         from firebase_admin import credentials, firestore
@@ -60,163 +124,360 @@ QA_COLLECTIONS = [
     'qa_employees',
     'qa_crops',
     'qa_fruits',
-    'qa_invoices'
+    'qa_invoices',
+    'qa_inventory',
+    'qa_meta'
 ]
 
+# Per-suite fixture declarations and where seeded fixture hashes are kept
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+FIXTURE_STATE = ('qa_meta', 'fixtures')
+
+# App collections as named in DataContext (production names, no prefix)
+APP_COLLECTIONS = [
+    'batches',
+    'expenses',
+    'yearlyExpenses',
+    'employees',
+    'crops',
+    'fruits',
+    'invoices',
+    'inventory'
+]
+
+
+def collection_name(base_name, qa=False):
+    """Collection name as the app resolves it (qa_ prefix in test mode)."""
+    return f"qa_{base_name}" if qa else base_name
+
+
+# Snapshots: gzip-compressed NDJSON, one document per line
+TMP_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '.tmp')
+SNAPSHOT_DIR = os.path.join(TMP_DIR, 'snapshots')
+EMULATOR_LOG = os.path.join(TMP_DIR, 'firestore_emulator.log')
+
+WRITE_BATCH_SIZE = 500  # Firestore limit per batched write
+WRITE_WORKERS = 8       # Batches committed in parallel
 
-def setup_test_data():
-    """Create sample test data in qa_* collections."""
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """
+    Read fixture declarations from fixtures/<suite>.json.
+    
+    Each file declares named fixtures: {"collection", "id", "data"}. Inside
+    data, {"$ref": "<fixture>"} becomes that fixture's document id,
+    {"$date": <days>} a YYYY-MM-DD date relative to today and {"$now": true}
+    the start of today as an ISO timestamp.
+    
+    Returns:
+        (fixtures by name, fixture names by suite)
+    """
+    fixtures = {}
+    suites = {}
+    for file_name in sorted(os.listdir(fixtures_dir)):
+        if not file_name.endswith('.json'):
+            continue
+        suite = file_name[:-len('.json')]
+        with open(os.path.join(fixtures_dir, file_name)) as f:
+            declared = json.load(f).get('fixtures', {})
+        for name, spec in declared.items():
+            if name in fixtures:
+                raise ValueError(f"Fixture '{name}' declared twice ({suite}.json)")
+            fixtures[name] = spec
+        suites[suite] = list(declared)
+    return fixtures, suites
+
+
+def _resolve_value(value, fixtures, today, refs, now_paths=None, path=()):
+    if isinstance(value, list):
+        return [_resolve_value(v, fixtures, today, refs, now_paths, path + (i,)) for i, v in enumerate(value)]
+    if not isinstance(value, dict):
+        return value
+    if '$ref' in value:
+        name = value['$ref']
+        if name not in fixtures:
+            raise ValueError(f"Unknown fixture reference: {name}")
+        refs.add(name)
+        return fixtures[name]['id']
+    if '$date' in value:
+        return (today + timedelta(days=value['$date'])).strftime('%Y-%m-%d')
+    if '$now' in value:
+        if now_paths is not None:
+            now_paths.append(path)
+        return datetime.combine(today, datetime.min.time()).isoformat()
+    return {k: _resolve_value(v, fixtures, today, refs, now_paths, path + (k,)) for k, v in value.items()}
+
+
+def _without_paths(value, paths):
+    """Deep copy of value with the fields at paths blanked (None)."""
+    value = json.loads(json.dumps(value, default=str))
+    for path in paths:
+        target = value
+        for key in path[:-1]:
+            try:
+                target = target[key]
+            except (KeyError, IndexError, TypeError):
+                target = None
+                break
+        if isinstance(target, dict) and path[-1] in target:
+            target[path[-1]] = None
+        elif isinstance(target, list) and isinstance(path[-1], int) and path[-1] < len(target):
+            target[path[-1]] = None
+    return value
+
+
+def resolve_fixtures(suites=None, fixtures_dir=FIXTURES_DIR):
+    """
+    Materialize the fixtures needed by suites (all suites if None).
+    
+    Referenced fixtures are pulled in even if they belong to another suite.
+    
+    Returns:
+        Dict of fixture name -> {'collection', 'id', 'data', 'now_paths', 'hash'},
+        referenced fixtures before the fixtures that use them. now_paths are
+        the fields filled from {"$now": true}; they are left out of the hash
+        and of comparisons with the seeded document, since they change daily.
+    """
+    fixtures, by_suite = load_fixtures(fixtures_dir)
+    if suites is None:
+        suites = list(by_suite)
+    today = datetime.now().date()
+    
+    resolved = {}
+    
+    def _visit(name, path):
+        if name in resolved:
+            return
+        if name in path:
+            raise ValueError(f"Fixture reference cycle: {' -> '.join(path + [name])}")
+        spec = fixtures[name]
+        refs = set()
+        now_paths = []
+        data = _resolve_value(spec['data'], fixtures, today, refs, now_paths)
+        data = {'id': spec['id'], **data}  # the app keeps the doc id in the data too
+        for ref in sorted(refs):
+            _visit(ref, path + [name])
+        content = json.dumps({'collection': spec['collection'], 'id': spec['id'],
+                              'data': _without_paths(data, now_paths)}, sort_keys=True)
+        resolved[name] = {
+            'collection': spec['collection'],
+            'id': spec['id'],
+            'data': data,
+            'now_paths': now_paths,
+            'hash': hashlib.sha256(content.encode()).hexdigest(),
+        }
+    
+    for suite in suites:
+        for name in by_suite.get(suite, []):
+            _visit(name, [])
+    return resolved
+
+
+def setup_test_data(suites=None, force=False):
+    """
+    Seed the fixtures needed by suites (all suites if None).
+    
+    Each fixture is compared with the document currently in Firestore (read
+    in chunks with get_all) and rewritten if it is missing or differs, so
+    documents changed by earlier test runs are restored. Fields set from
+    $now are not compared. force rewrites every needed fixture.
+    
+    Seeded fixture locations are kept in qa_meta/fixtures; documents of
+    fixtures no longer declared in any fixtures/*.json are deleted.
+    """
     db = get_firestore_client()
     if not db:
         return False
     
     print("[QA] Setting up test data...")
     
-    today = datetime.now()
+    try:
+        needed = resolve_fixtures(suites)
+        declared, _ = load_fixtures()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[ERROR] Invalid fixtures: {e}")
+        return False
     
-    # Create test batches
-    batches = [
-        {
-            'id': 'Goat-1',
-            'name': 'QA Test Goat Batch',
-            'type': 'Goat',
-            'date': (today - timedelta(days=30)).strftime('%Y-%m-%d'),
-            'status': 'Raising',
-            'expenses': [],
-            'animals': [
-                {
-                    'id': 'GTJANM26-1',
-                    'gender': 'Male',
-                    'weight': 25,
-                    'purchaseCost': 8000,
-                    'status': 'Healthy',
-                    'entryDate': today.strftime('%Y-%m-%d'),
-                    'weightHistory': [{'date': today.strftime('%Y-%m-%d'), 'weight': 25}]
-                },
-                {
-                    'id': 'GTJANF26-1',
-                    'gender': 'Female',
-                    'weight': 22,
-                    'purchaseCost': 7500,
-                    'status': 'Healthy',
-                    'entryDate': today.strftime('%Y-%m-%d'),
-                    'weightHistory': [{'date': today.strftime('%Y-%m-%d'), 'weight': 22}]
-                }
-            ],
-            'createdAt': today.isoformat()
-        },
-        {
-            'id': 'Sheep-1',
-            'name': 'QA Test Sheep Batch',
-            'type': 'Sheep',
-            'date': (today - timedelta(days=20)).strftime('%Y-%m-%d'),
-            'status': 'Raising',
-            'expenses': [],
-            'animals': [
-                {
-                    'id': 'SHJANM26-1',
-                    'gender': 'Male',
-                    'weight': 30,
-                    'purchaseCost': 6000,
-                    'status': 'Healthy',
-                    'entryDate': today.strftime('%Y-%m-%d'),
-                    'weightHistory': [{'date': today.strftime('%Y-%m-%d'), 'weight': 30}]
-                }
-            ],
-            'createdAt': today.isoformat()
-        },
-        {
-            'id': 'Poultry-1',
-            'name': 'QA Test Poultry Batch',
-            'type': 'Poultry',
-            'date': (today - timedelta(days=10)).strftime('%Y-%m-%d'),
+    def _compare_chunk(coll_name, chunk):
+        coll = db.collection(coll_name)
+        current = {snap.id: snap.to_dict() for snap in db.get_all([coll.document(f['id']) for f in chunk])
+                   if snap.exists}
+        return [f for f in chunk
+                if f['id'] not in current
+                or _without_paths(current[f['id']], f['now_paths']) != _without_paths(f['data'], f['now_paths'])]
+    
+    def _chunks():
+        by_collection = {}
+        for f in needed.values():
+            by_collection.setdefault(f['collection'], []).append(f)
+        for coll_name, items in by_collection.items():
+            for start in range(0, len(items), WRITE_BATCH_SIZE):
+                yield lambda c=coll_name, chunk=items[start:start + WRITE_BATCH_SIZE]: _compare_chunk(c, chunk)
+    
+    try:
+        state_ref = db.collection(FIXTURE_STATE[0]).document(FIXTURE_STATE[1])
+        seeded = state_ref.get().to_dict() or {}
+        
+        if force:
+            changed = list(needed.values())
+        else:
+            changed = [f for result in run_bounded(_chunks()) for f in result]
+        
+        # Fixtures removed from the JSON files (older state entries were bare hashes)
+        live = {(spec['collection'], spec['id']) for spec in declared.values()}
+        removed = {name: entry for name, entry in seeded.items()
+                   if name not in declared and isinstance(entry, dict)
+                   and (entry.get('collection'), entry.get('id')) not in live}
+        
+        written = bulk_write(db, (
+            ('set', db.collection(f['collection']).document(f['id']), f['data'])
+            for f in changed
+        ))
+        deleted = bulk_write(db, (
+            ('delete', db.collection(entry['collection']).document(entry['id']), None)
+            for entry in removed.values()
+        ))
+        
+        state = {name: entry for name, entry in seeded.items() if name in declared}
+        state.update({name: {'collection': f['collection'], 'id': f['id'], 'hash': f['hash']}
+                      for name, f in needed.items()})
+        if state != seeded:
+            state_ref.set(state)
+        
+        per_collection = {}
+        for f in changed:
+            per_collection[f['collection']] = per_collection.get(f['collection'], 0) + 1
+        for coll_name, count in sorted(per_collection.items()):
+            print(f"  Wrote {count} documents to {coll_name}")
+        for name, entry in sorted(removed.items()):
+            print(f"  Deleted {entry['collection']}/{entry['id']} (fixture '{name}' removed)")
+        
+        print(f"\n[QA] Test data setup complete!")
+        print(f"  - {len(needed)} fixtures needed, {written} written, {len(needed) - len(changed)} unchanged, {deleted} deleted")
+        return True
+        
+    except Exception as e:
+        print(f"[ERROR] Failed to create test data: {e}")
+        return False
+
+
+# Scaled datasets for benchmarks (see benchmark.py)
+SCALE_BATCH_SIZE = 50      # animals per batch document
+SCALE_TYPES = ['Goat', 'Sheep', 'Chicken', 'Cow']
+SCALE_CATEGORIES = ['Feed', 'Medicine', 'Labor', 'Equipment', 'Utilities', 'Transport']
+
+
+def generate_scale_data(animals, expenses=None, seed=0):
+    """
+    Deterministic synthetic farm of a given size.
+    
+    Animals are spread over batches of SCALE_BATCH_SIZE with a few weight
+    records each; about 10% are sold and 2% deceased. Expenses (default: one
+    per animal) cover the last year, half of them linked to a batch and
+    mirrored into the batch's expenses array like addExpense does.
+    
+    Yields:
+        (collection, document id, data) tuples
+    """
+    rng = random.Random(seed)
+    expenses = animals if expenses is None else expenses
+    today = datetime.now().date()
+    now = datetime.now().isoformat()
+    
+    def _day(max_days_ago):
+        return (today - timedelta(days=rng.randint(0, max_days_ago))).isoformat()
+    
+    batches = []
+    for b in range(math.ceil(animals / SCALE_BATCH_SIZE)):
+        batch_type = SCALE_TYPES[b % len(SCALE_TYPES)]
+        start = _day(365)
+        batch = {
+            'id': f"Bench-{b + 1}",
+            'name': f"Bench {batch_type} Batch {b + 1}",
+            'type': batch_type,
+            'date': start,
             'status': 'Raising',
-            'expenses': [],
             'animals': [],
-            'createdAt': today.isoformat()
-        },
-        {
-            'id': 'Cow-1',
-            'name': 'QA Test Cow Batch',
-            'type': 'Cow',
-            'date': (today - timedelta(days=5)).strftime('%Y-%m-%d'),
-            'status': 'Raising',
             'expenses': [],
-            'animals': [],
-            'createdAt': today.isoformat()
+            'createdAt': now,
         }
-    ]
+        for a in range(min(SCALE_BATCH_SIZE, animals - b * SCALE_BATCH_SIZE)):
+            weight = rng.randint(5, 60)
+            roll = rng.random()
+            animal = {
+                'id': f"BN{b + 1}-{a + 1}",
+                'gender': rng.choice(['Male', 'Female']),
+                'weight': weight,
+                'purchaseCost': rng.randint(2000, 12000),
+                'status': 'Sold' if roll < 0.10 else 'Deceased' if roll < 0.12 else 'Healthy',
+                'entryDate': start,
+                'weightHistory': [{'date': _day(300), 'weight': weight - i} for i in range(3, -1, -1)],
+            }
+            if animal['status'] == 'Sold':
+                animal['soldPrice'] = rng.randint(5000, 20000)
+                animal['soldDate'] = _day(180)
+            batch['animals'].append(animal)
+        batches.append(batch)
     
-    # Create test expenses
-    expenses = [
-        {
-            'id': 'exp-qa-001',
-            'description': 'QA Test Feed Expense',
-            'category': 'Feed',
-            'amount': 5000,
-            'date': today.strftime('%Y-%m-%d'),
-            'batchId': 'Goat-1',
-            'createdAt': today.isoformat()
-        },
-        {
-            'id': 'exp-qa-002',
-            'description': 'QA Test Medical Expense',
-            'category': 'Medical',
-            'amount': 1500,
-            'date': (today - timedelta(days=5)).strftime('%Y-%m-%d'),
-            'batchId': 'Sheep-1',
-            'createdAt': today.isoformat()
+    for e in range(expenses):
+        expense_id = f"Bench-E{e + 1}"
+        category = rng.choice(SCALE_CATEGORIES)
+        amount = rng.randint(100, 20000)
+        date = _day(365)
+        batch = batches[rng.randrange(len(batches))] if batches and rng.random() < 0.5 else None
+        if batch:
+            batch['expenses'].append({'id': expense_id, 'type': category, 'description': f"{category} {e + 1}",
+                                      'amount': amount, 'date': date})
+        yield 'qa_expenses', expense_id, {
+            'category': category,
+            'description': f"{category} {e + 1}",
+            'amount': amount,
+            'date': date,
+            'batchId': batch['id'] if batch else None,
+            'cropId': None,
+            'fruitId': None,
+            'createdAt': now,
         }
-    ]
     
-    # Create test employees
-    employees = [
-        {
-            'id': 'emp-qa-001',
-            'name': 'QA Test Worker 1',
-            'role': 'Farm Hand',
-            'phone': '9999999991',
-            'salary': 15000,
-            'status': 'Active',
-            'createdAt': today.isoformat()
-        },
-        {
-            'id': 'emp-qa-002',
-            'name': 'QA Test Worker 2',
-            'role': 'Supervisor',
-            'phone': '9999999992',
-            'salary': 25000,
-            'status': 'Active',
-            'createdAt': today.isoformat()
-        }
-    ]
+    for batch in batches:
+        yield 'qa_batches', batch['id'], batch
+
+
+def seed_scale_data(animals, expenses=None, seed=0):
+    """
+    Replace the qa_* collections with a generated dataset of a given size.
+    
+    Everything else in qa_* is deleted, including the fixture state, so the
+    next setup_test_data() reseeds all fixtures.
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
     
-    # Write to Firestore
+    print(f"[QA] Seeding {animals} animals, {animals if expenses is None else expenses} expenses...")
+    start = time.time()
     try:
-        # Batches
-        for batch in batches:
-            db.collection('qa_batches').document(batch['id']).set(batch)
-            print(f"  Created batch: {batch['id']}")
-        
-        # Expenses
-        for expense in expenses:
-            db.collection('qa_expenses').document(expense['id']).set(expense)
-            print(f"  Created expense: {expense['id']}")
-        
-        # Employees
-        for emp in employees:
-            db.collection('qa_employees').document(emp['id']).set(emp)
-            print(f"  Created employee: {emp['id']}")
+        generated = {}
         
-        print(f"\n[QA] Test data setup complete!")
-        print(f"  - {len(batches)} batches")
-        print(f"  - {len(expenses)} expenses")
-        print(f"  - {len(employees)} employees")
-        return True
+        def _writes():
+            for coll_name, doc_id, data in generate_scale_data(animals, expenses, seed):
+                generated.setdefault(coll_name, set()).add(doc_id)
+                yield ('set', db.collection(coll_name).document(doc_id), data)
+        written = bulk_write(db, _writes())
         
+        def _deletes():
+            for coll_name in QA_COLLECTIONS:
+                keep = generated.get(coll_name, set())
+                for snap in db.collection(coll_name).select([]).stream():
+                    if snap.id not in keep:
+                        yield ('delete', snap.reference, None)
+        deleted = bulk_write(db, _deletes())
     except Exception as e:
-        print(f"[ERROR] Failed to create test data: {e}")
+        print(f"[ERROR] Failed to seed scaled data: {e}")
         return False
+    
+    print(f"[QA] Seeded in {time.time() - start:.1f}s: {written} written, {deleted} deleted")
+    return True
 
 
 def cleanup_test_data():
@@ -246,6 +507,360 @@ def cleanup_test_data():
     return True
 
 
+def emulator_running(host=DEFAULT_EMULATOR_HOST):
+    """Check whether a Firestore emulator answers on host."""
+    try:
+        with urllib.request.urlopen(f"http://{host}/", timeout=1) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def _emulator_request(host, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f"http://{host}{path}", data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status
+
+
+def start_emulator(host=None, wait=60):
+    """
+    Attach to a running Firestore emulator, or start one with the Firebase CLI.
+    
+    Sets FIRESTORE_EMULATOR_HOST so get_firestore_client() uses the emulator,
+    and loads open rules for qa_* collections.
+    
+    Returns:
+        (host, process) - process is None when an emulator was already
+        running. host is None if no emulator could be reached.
+    """
+    host = host or os.environ.get('FIRESTORE_EMULATOR_HOST') or DEFAULT_EMULATOR_HOST
+    process = None
+    
+    if not emulator_running(host):
+        firebase_cmd = shutil.which('firebase')
+        cmd = [firebase_cmd] if firebase_cmd else [shutil.which('npx') or 'npx', '--yes', 'firebase-tools']
+        port = host.rsplit(':', 1)[-1]
+        cmd += ['emulators:start', '--only', 'firestore', '--project', EMULATOR_PROJECT]
+        # Port comes from an inline config so firebase.json stays deploy-only
+        config_path = os.path.join(TMP_DIR, 'firebase.emulator.json')
+        os.makedirs(os.path.dirname(config_path), exist_ok=True)
+        with open(config_path, 'w') as f:
+            json.dump({'firestore': {}, 'emulators': {'firestore': {'host': host.rsplit(':', 1)[0], 'port': int(port)},
+                                                    'ui': {'enabled': False}}}, f)
+        cmd += ['--config', os.path.abspath(config_path)]
+        
+        print(f"[QA] Starting Firestore emulator on {host}...")
+        try:
+            with open(EMULATOR_LOG, 'w') as log:
+                process = subprocess.Popen(cmd, cwd=APP_DIR, stdout=log, stderr=subprocess.STDOUT)
+        except OSError as e:
+            print(f"[ERROR] Could not start emulator: {e}")
+            print("Install the Firebase CLI: npm install -g firebase-tools")
+            return None, None
+        
+        deadline = time.time() + wait
+        while not emulator_running(host):
+            if process.poll() is not None or time.time() > deadline:
+                print("[ERROR] Firestore emulator did not start")
+                process.kill()
+                process.wait()
+                with open(EMULATOR_LOG, errors='replace') as log:
+                    for line in log.read().splitlines()[-10:]:
+                        print(f"  {line}")
+                print(f"  Full output: {os.path.abspath(EMULATOR_LOG)}")
+                return None, None
+            time.sleep(0.5)
+    
+    os.environ['FIRESTORE_EMULATOR_HOST'] = host
+    try:
+        _emulator_request(host, 'PUT', f"/emulator/v1/projects/{EMULATOR_PROJECT}:securityRules",
+                          {'rules': {'files': [{'name': 'qa.rules', 'content': EMULATOR_RULES}]}})
+    except Exception as e:
+        print(f"  Warning: Could not load QA rules into emulator: {e}")
+    
+    print(f"[QA] Using Firestore emulator at {host}")
+    return host, process
+
+
+def reset_emulator(host=None):
+    """Delete every document in the emulator in one request."""
+    host = host or os.environ.get('FIRESTORE_EMULATOR_HOST')
+    if not host:
+        print("[ERROR] FIRESTORE_EMULATOR_HOST is not set")
+        return False
+    try:
+        _emulator_request(host, 'DELETE', f"/emulator/v1/projects/{EMULATOR_PROJECT}/databases/(default)/documents")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Failed to reset emulator: {e}")
+        return False
+
+
+def _encode_value(value):
+    """Convert Firestore values into JSON-safe values (tagged where needed)."""
+    if isinstance(value, dict):
+        return {k: _encode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, datetime):
+        return {'__type__': 'timestamp', 'value': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__type__': 'bytes', 'value': base64.b64encode(value).decode('ascii')}
+    if hasattr(value, 'latitude') and hasattr(value, 'longitude'):
+        return {'__type__': 'geopoint', 'latitude': value.latitude, 'longitude': value.longitude}
+    if hasattr(value, 'path') and hasattr(value, 'collection'):
+        return {'__type__': 'reference', 'value': value.path}
+    return value
+
+
+def _decode_value(value, db):
+    """Inverse of _encode_value."""
+    if isinstance(value, list):
+        return [_decode_value(v, db) for v in value]
+    if not isinstance(value, dict):
+        return value
+    kind = value.get('__type__')
+    if kind == 'timestamp':
+        return datetime.fromisoformat(value['value'])
+    if kind == 'bytes':
+        return base64.b64decode(value['value'])
+    if kind == 'geopoint':
+        from google.cloud.firestore import GeoPoint
+        return GeoPoint(value['latitude'], value['longitude'])
+    if kind == 'reference':
+        return db.document(value['value'])
+    return {k: _decode_value(v, db) for k, v in value.items()}
+
+
+def _snapshot_path(name):
+    if not name or os.sep in name or (os.altsep and os.altsep in name) or name.startswith('.'):
+        raise ValueError(f"Invalid snapshot name: {name!r}")
+    return os.path.join(SNAPSHOT_DIR, f"{name}.ndjson.gz")
+
+
+def run_bounded(tasks, workers=WRITE_WORKERS):
+    """
+    Run callables on a thread pool with a bounded number in flight.
+    
+    tasks is consumed lazily, so producers can stream from disk or Firestore
+    without holding everything in memory.
+    
+    Returns:
+        List of task results (in completion order)
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for task in tasks:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(f.result() for f in done)
+            pending.add(pool.submit(task))
+        for future in pending:
+            results.append(future.result())
+    return results
+
+
+def bulk_write(db, operations, workers=WRITE_WORKERS):
+    """
+    Commit ('set'|'delete', ref, data) operations as parallel batched writes.
+    
+    Returns:
+        Number of operations committed
+    """
+    def _commit(chunk):
+        batch = db.batch()
+        for op, ref, data in chunk:
+            if op == 'delete':
+                batch.delete(ref)
+            else:
+                batch.set(ref, data)
+        batch.commit()
+        return len(chunk)
+
+    def _chunks():
+        chunk = []
+        for operation in operations:
+            chunk.append(operation)
+            if len(chunk) >= WRITE_BATCH_SIZE:
+                yield lambda c=chunk: _commit(c)
+                chunk = []
+        if chunk:
+            yield lambda c=chunk: _commit(c)
+
+    return sum(run_bounded(_chunks(), workers))
+
+
+def _collection_path(coll):
+    """Slash-separated path of a (sub)collection, e.g. qa_batches/B1/animals."""
+    return f"{coll.parent.path}/{coll.id}" if coll.parent else coll.id
+
+
+def _subcollections(coll):
+    """Subcollections of every document in a collection (document ids only are read)."""
+    for snap in coll.select([]).stream():
+        yield from snap.reference.collections()
+
+
+def _delete_tree(doc_ref):
+    """Delete operations for a document and everything below it (children first)."""
+    for sub in doc_ref.collections():
+        for snap in sub.select([]).stream():
+            yield from _delete_tree(snap.reference)
+    yield ('delete', doc_ref, None)
+
+
+def save_snapshot(name):
+    """
+    Stream every qa_* collection, subcollections included, to a compressed
+    NDJSON archive.
+
+    Each collection is written in one run (its subcollections follow it), so
+    restore can compare one collection at a time.
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+    
+    path = _snapshot_path(name)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    print(f"[QA] Saving snapshot '{name}'...")
+    
+    counts = {}
+    part_path = path + '.part'
+
+    def _save_collection(f, coll):
+        coll_path = _collection_path(coll)
+        count = 0
+        for doc in coll.stream():
+            line = {'collection': coll_path, 'id': doc.id, 'data': _encode_value(doc.to_dict())}
+            f.write(json.dumps(line, sort_keys=True) + '\n')
+            count += 1
+        top = coll_path.split('/')[0]
+        counts[top] = counts.get(top, 0) + count
+        for sub in _subcollections(coll):
+            _save_collection(f, sub)
+
+    try:
+        with gzip.open(part_path, 'wt', encoding='utf-8') as f:
+            for coll_name in QA_COLLECTIONS:
+                _save_collection(f, db.collection(coll_name))
+                if counts.get(coll_name):
+                    print(f"  {coll_name}: {counts[coll_name]} documents")
+        os.replace(part_path, path)
+    except Exception as e:
+        print(f"[ERROR] Failed to save snapshot: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return False
+    
+    size_kb = os.path.getsize(path) / 1024
+    print(f"\n[QA] Snapshot saved: {path} ({sum(counts.values())} documents, {size_kb:.1f} KB)")
+    return True
+
+
+def restore_snapshot(name):
+    """
+    Reset qa_* collections and their subcollections to a snapshot.
+    
+    The archive is streamed one collection at a time: each 500-document chunk
+    is compared against the current documents and only differing documents
+    are rewritten, with chunks committed in parallel. Once a collection has
+    been read, its live documents that are not in the snapshot are deleted
+    (with their subcollections), and only that collection's ids are held in
+    memory. Subcollections the snapshot does not contain at all - e.g. ones
+    written by a migration after it was saved - are deleted at the end.
+    """
+    db = get_firestore_client()
+    if not db:
+        return False
+    
+    path = _snapshot_path(name)
+    if not os.path.exists(path):
+        print(f"[ERROR] Snapshot not found: {path}")
+        return False
+    
+    print(f"[QA] Restoring snapshot '{name}'...")
+    restored_collections = set()
+    
+    def _restore_chunk(coll_name, entries):
+        coll = db.collection(coll_name)
+        refs = [coll.document(doc_id) for doc_id, _ in entries]
+        current = {snap.id: snap.to_dict() for snap in db.get_all(refs) if snap.exists}
+        batch = db.batch()
+        changed = 0
+        for doc_id, data in entries:
+            if current.get(doc_id) != data:
+                batch.set(coll.document(doc_id), data)
+                changed += 1
+        if changed:
+            batch.commit()
+        return changed, len(entries) - changed, 0
+
+    def _delete_extra(coll_name, ids):
+        def _extra_docs():
+            for snap in db.collection(coll_name).select([]).stream():
+                if snap.id not in ids:
+                    yield from _delete_tree(snap.reference)
+        return 0, 0, bulk_write(db, _extra_docs(), workers=1)
+
+    def _tasks():
+        coll_name, ids, chunk = None, set(), []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if chunk and (entry['collection'] != coll_name or len(chunk) >= WRITE_BATCH_SIZE):
+                    yield lambda c=coll_name, e=chunk: _restore_chunk(c, e)
+                    chunk = []
+                if entry['collection'] != coll_name:
+                    if coll_name is not None:
+                        yield lambda c=coll_name, i=ids: _delete_extra(c, i)
+                    coll_name, ids = entry['collection'], set()
+                    restored_collections.add(coll_name)
+                ids.add(entry['id'])
+                chunk.append((entry['id'], _decode_value(entry['data'], db)))
+        if chunk:
+            yield lambda c=coll_name, e=chunk: _restore_chunk(c, e)
+        if coll_name is not None:
+            yield lambda c=coll_name, i=ids: _delete_extra(c, i)
+
+    def _unrestored_docs(coll):
+        # Collections missing from the archive were empty when it was saved
+        if _collection_path(coll) not in restored_collections:
+            for snap in coll.select([]).stream():
+                yield from _delete_tree(snap.reference)
+            return
+        for sub in _subcollections(coll):
+            yield from _unrestored_docs(sub)
+
+    try:
+        results = run_bounded(_tasks())
+        written = sum(r[0] for r in results)
+        unchanged = sum(r[1] for r in results)
+        deleted = sum(r[2] for r in results)
+        deleted += bulk_write(db, (op for coll_name in QA_COLLECTIONS
+                                   for op in _unrestored_docs(db.collection(coll_name))))
+    except Exception as e:
+        print(f"[ERROR] Failed to restore snapshot: {e}")
+        return False
+    
+    print(f"\n[QA] Snapshot restored: {written} written, {unchanged} unchanged, {deleted} deleted")
+    return True
+
+
+def list_snapshots():
+    """Print saved snapshots."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        print("[QA] No snapshots saved")
+        return
+    for file_name in sorted(os.listdir(SNAPSHOT_DIR)):
+        if file_name.endswith('.ndjson.gz'):
+            size_kb = os.path.getsize(os.path.join(SNAPSHOT_DIR, file_name)) / 1024
+            print(f"  {file_name[:-len('.ndjson.gz')]} ({size_kb:.1f} KB)")
+
+
 def main():
     if len(sys.argv) < 2:
         print(__doc__)
@@ -254,12 +869,51 @@ def main():
     command = sys.argv[1].lower()
     
     if command == 'setup':
-        setup_test_data()
+        suites = [a for a in sys.argv[2:] if not a.startswith('--')] or None
+        setup_test_data(suites, force='--force' in sys.argv)
     elif command == 'cleanup':
         cleanup_test_data()
+    elif command == 'scale':
+        if len(sys.argv) < 3:
+            print("Use: scale <animals> [expenses]")
+            sys.exit(1)
+        expenses = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        if not seed_scale_data(int(sys.argv[2]), expenses):
+            sys.exit(1)
+    elif command == 'snapshot':
+        action = sys.argv[2].lower() if len(sys.argv) > 2 else ''
+        if action == 'list':
+            list_snapshots()
+        elif action in ('save', 'restore') and len(sys.argv) > 3:
+            ok = save_snapshot(sys.argv[3]) if action == 'save' else restore_snapshot(sys.argv[3])
+            if not ok:
+                sys.exit(1)
+        else:
+            print("Use: snapshot save <name> | snapshot restore <name> | snapshot list")
+    elif command == 'emulator':
+        action = sys.argv[2].lower() if len(sys.argv) > 2 else ''
+        if action == 'start':
+            host, process = start_emulator(sys.argv[3] if len(sys.argv) > 3 else None)
+            if not host:
+                sys.exit(1)
+            if process:
+                print("[QA] Emulator running, press Ctrl+C to stop")
+                try:
+                    process.wait()
+                except KeyboardInterrupt:
+                    process.terminate()
+        elif action == 'reset':
+            if not os.environ.get('FIRESTORE_EMULATOR_HOST'):
+                os.environ['FIRESTORE_EMULATOR_HOST'] = DEFAULT_EMULATOR_HOST
+            if reset_emulator():
+                print("[QA] Emulator database cleared")
+            else:
+                sys.exit(1)
+        else:
+            print("Use: emulator start [host:port] | emulator reset")
     else:
         print(f"Unknown command: {command}")
-        print("Use: setup or cleanup")
+        print("Use: setup, cleanup, scale, snapshot or emulator")
 
 
 if __name__ == '__main__':
@@ -5,6 +5,14 @@ Tests Add Batch, Add Animals, Sell Animals, Weight Tracking.
 
 import time
 
+# App sources (relative to farm-app/src) exercised by this suite, used by watch mode
+SOURCES = ["pages/Livestock.jsx"]
+
+# Tests that must run before another test (used by --last-failed / --skip-unchanged)
+PREREQUISITES = {
+    "add_animals_to_batch": ["create_batch_goat"],
+}
+
 
 def test_navigate_to_livestock(browser):
     """Test navigating to the Livestock page."""
@@ -62,18 +70,16 @@ def _test_add_batch(browser, animal_type: str):
     
     time.sleep(0.5)
     
-    # Fill batch form
+    # Fill batch form in one call
     batch_name = f"QA Test {animal_type} {int(time.time()) % 10000}"
-    
-    # Enter batch name
-    browser.type_text("input[placeholder*='batch'], input[placeholder*='Batch']", batch_name)
-    
-    # Select animal type
-    browser.select_option("select", animal_type)
-    
-    # Enter date
     today = time.strftime("%Y-%m-%d")
-    browser.type_text("input[type='date']", today)
+    failed_fields = browser.fill_form("form", {
+        "Batch Name": batch_name,
+        "Livestock Type": animal_type,
+        "Start Date": today,
+    })
+    if failed_fields:
+        return {"passed": False, "error": f"Could not fill batch form fields: {failed_fields}"}
     
     # Submit
     browser.click("button[type='submit']:has-text('Create'), button:has-text('Create Batch')")
@@ -138,20 +144,14 @@ def test_add_animals_to_batch(browser):
     
     time.sleep(1)
     
-    # Fill animal form
-    # Number of animals
-    browser.type_text("input[type='number'][min='1']", "2")
-    
-    # Weight
-    weight_inputs = browser.get_elements("input[type='number']")
-    if len(weight_inputs) >= 2:
-        weight_inputs[1].clear()
-        weight_inputs[1].send_keys("25")
-    
-    # Cost
-    if len(weight_inputs) >= 3:
-        weight_inputs[2].clear()
-        weight_inputs[2].send_keys("5000")
+    # Fill animal form in one call
+    failed_fields = browser.fill_form("form", {
+        "Number of Animals": "2",
+        "Weight (kg)": "25",
+        "Cost per Animal": "5000",
+    })
+    if failed_fields:
+        return {"passed": False, "error": f"Could not fill animal form fields: {failed_fields}"}
     
     # Submit
     browser.click("button[type='submit']:has-text('Add')")
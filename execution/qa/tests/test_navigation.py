@@ -5,6 +5,13 @@ Tests sidebar navigation and page loading.
 
 import time
 
+# App sources (relative to farm-app/src) exercised by this suite, used by watch mode
+SOURCES = [
+    "components/layout/",
+    "pages/Dashboard.jsx",
+    "pages/Expenses.jsx",
+]
+
 
 def test_page_loads(browser):
     """Test that the main page loads without errors."""
@@ -82,7 +89,7 @@ def test_expenses_navigation(browser):
 
 
 def test_no_console_errors(browser):
-    """Test that there are no severe console errors."""
+    """Test that no severe console/network errors were logged so far this run."""
     try:
         errors = browser.get_console_errors()
         # Filter out common non-critical errors
@@ -91,8 +98,8 @@ def test_no_console_errors(browser):
         return {
             "passed": len(critical_errors) == 0,
             "details": {
-                "error_count": len(critical_errors),
-                "errors": [e.get('message', '')[:100] for e in critical_errors[:5]]
+                "error_count": sum(e.get('count', 1) for e in critical_errors),
+                "errors": [f"{e.get('message', '')[:100]} (x{e.get('count', 1)})" for e in critical_errors[:5]]
             }
         }
     except Exception as e:
@@ -110,4 +117,5 @@ def get_tests():
         ("sidebar_links", test_sidebar_links),
         ("dashboard_navigation", test_dashboard_navigation),
         ("expenses_navigation", test_expenses_navigation),
+        ("no_console_errors", test_no_console_errors),
     ]
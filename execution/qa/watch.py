@@ -0,0 +1,200 @@
+"""
+Watch mode helpers for the QA runner.
+Watches farm-app/src and the QA tests, waits for Vite HMR to settle and
+works out which suites a saved file affects.
+
+Used by `qa_runner.py --watch`.
+"""
+
+import importlib
+import queue
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urljoin
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+APP_SRC_DIR = ROOT_DIR / 'farm-app' / 'src'
+TESTS_DIR = Path(__file__).parent / 'tests'
+
+# Sources (relative to farm-app/src) that every page depends on.
+# A change here re-runs all watched suites.
+SHARED_SOURCES = (
+    'App.jsx',
+    'main.jsx',
+    'index.css',
+    'App.css',
+    'context/',
+    'lib/',
+    'components/ui/',
+)
+
+DEBOUNCE = 0.3  # seconds of quiet before a batch of changes is processed
+IGNORED_SUFFIXES = ('.pyc', '.swp', '.swx', '.tmp', '~')
+
+
+class FileWatcher:
+    """Collects changed file paths using watchdog (inotify on Linux)."""
+
+    def __init__(self, paths):
+        self.paths = [Path(p) for p in paths]
+        self.changes = queue.Queue()
+        self.observer = None
+
+    def start(self):
+        """Start watching. Returns False if watchdog is not installed."""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            print("[ERROR] watchdog not installed. Run: pip install watchdog")
+            return False
+
+        changes = self.changes
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type not in ('created', 'modified', 'moved'):
+                    return
+                path = getattr(event, 'dest_path', None) or event.src_path
+                if '__pycache__' in path or path.endswith(IGNORED_SUFFIXES):
+                    return
+                changes.put(Path(path).resolve())
+
+        self.observer = Observer()
+        for path in self.paths:
+            if path.exists():
+                self.observer.schedule(_Handler(), str(path), recursive=True)
+        self.observer.start()
+        return True
+
+    def stop(self):
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    def wait_for_changes(self, poll: float = 0.5) -> list:
+        """Block until files change, then return the debounced batch."""
+        while True:
+            try:
+                first = self.changes.get(timeout=poll)
+                break
+            except queue.Empty:
+                continue
+
+        changed = {first}
+        while True:
+            try:
+                changed.add(self.changes.get(timeout=DEBOUNCE))
+            except queue.Empty:
+                break
+        return sorted(changed)
+
+
+def _app_relative(path: Path):
+    try:
+        return path.resolve().relative_to(APP_SRC_DIR.resolve()).as_posix()
+    except ValueError:
+        return None
+
+
+def impacted_suites(changed: list, suite_modules: dict) -> tuple:
+    """
+    Map changed files to the suites that cover them.
+
+    Test modules declare the app sources they exercise in a module-level
+    SOURCES list (paths relative to farm-app/src, prefixes allowed). App
+    sources no suite declares re-run every suite, so a save is never ignored.
+
+    Returns:
+        (suites to re-run, suites whose test module must be reloaded,
+         app sources no suite declares)
+    """
+    run = set()
+    reload = set()
+    unmapped = []
+
+    for path in changed:
+        path = Path(path)
+        if path.suffix == '.py' and path.parent.resolve() == TESTS_DIR.resolve():
+            for name, module in suite_modules.items():
+                if module.__name__.rsplit('.', 1)[-1] == path.stem:
+                    run.add(name)
+                    reload.add(name)
+            continue
+
+        rel = _app_relative(path)
+        if rel is None:
+            continue
+        if any(rel == s or (s.endswith('/') and rel.startswith(s)) for s in SHARED_SOURCES):
+            run.update(suite_modules)
+            continue
+        covered = False
+        for name, module in suite_modules.items():
+            sources = getattr(module, 'SOURCES', [])
+            if any(rel == s or (s.endswith('/') and rel.startswith(s)) for s in sources):
+                run.add(name)
+                covered = True
+        if not covered:
+            unmapped.append(rel)
+            run.update(suite_modules)
+
+    # Keep the configured suite order
+    ordered = [name for name in suite_modules if name in run]
+    return ordered, reload, unmapped
+
+
+def reload_suites(suite_modules: dict, names) -> list:
+    """Hot-reload test modules in place. Returns names that failed to import."""
+    failed = []
+    for name in names:
+        try:
+            suite_modules[name] = importlib.reload(suite_modules[name])
+        except Exception as e:
+            print(f"  ❌ Could not reload {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def wait_for_hmr(browser, app_url: str, changed: list, timeout: int = 15) -> list:
+    """
+    Wait until Vite has rebuilt the changed modules and the page has settled.
+
+    Requesting a module from the dev server blocks until Vite has transformed
+    it, and surfaces compile errors as HTTP 500. After that the page is
+    polled until React has re-rendered (HMR) or the full reload completed.
+
+    Returns:
+        List of (path, error) tuples for modules that failed to compile
+    """
+    errors = []
+    for path in changed:
+        rel = _app_relative(Path(path))
+        if rel is None or not rel.endswith(('.js', '.jsx', '.ts', '.tsx', '.css')):
+            continue
+        module_url = urljoin(app_url, 'src/' + rel)
+        try:
+            urllib.request.urlopen(module_url, timeout=timeout).read()
+        except urllib.error.HTTPError as e:
+            errors.append((rel, f"HTTP {e.code}"))
+        except Exception as e:
+            errors.append((rel, str(e)))
+
+    # Give the HMR websocket a moment to push the update to the page
+    time.sleep(0.2)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            settled = browser.driver.execute_script(
+                "var root = document.getElementById('root');"
+                "return document.readyState === 'complete' && !!root && root.children.length > 0 "
+                "&& !document.querySelector('vite-error-overlay');"
+            )
+            if settled:
+                break
+        except Exception:
+            pass  # page is mid-reload
+        time.sleep(0.1)
+    return errors
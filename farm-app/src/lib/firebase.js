@@ -1,5 +1,5 @@
 import { initializeApp } from 'firebase/app';
-import { getFirestore } from 'firebase/firestore';
+import { getFirestore, connectFirestoreEmulator } from 'firebase/firestore';
 import { getAuth, GoogleAuthProvider } from 'firebase/auth';
 
 // Firebase configuration
@@ -20,6 +20,19 @@ const app = initializeApp(firebaseConfig);
 // Initialize Firestore
 export const db = getFirestore(app);
 
+// QA EMULATOR MODE:
+// With ?qa_test=true&qa_emulator=127.0.0.1:8080 in development, talk to a local
+// Firestore emulator instead of the real project (see execution/qa/test_data.py).
+if (import.meta.env.DEV && typeof window !== 'undefined') {
+    const params = new URLSearchParams(window.location.search);
+    const emulatorHost = params.get('qa_emulator');
+    if (params.get('qa_test') === 'true' && emulatorHost) {
+        const [host, port] = emulatorHost.split(':');
+        connectFirestoreEmulator(db, host, Number(port) || 8080);
+        console.log(`[QA] Using Firestore emulator at ${host}:${Number(port) || 8080}`);
+    }
+}
+
 // Initialize Auth
 export const auth = getAuth(app);
 export const googleProvider = new GoogleAuthProvider();
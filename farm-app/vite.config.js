@@ -10,4 +10,10 @@ export default defineConfig({
     tailwindcss(),
 
   ],
+  build: {
+    // Chunk map for execution/bundle_budget.py (dist/.vite is not deployed)
+    manifest: true,
+    // BUNDLE_ANALYZE=1 npm run build: source maps without the sourceMappingURL comment
+    sourcemap: process.env.BUNDLE_ANALYZE ? 'hidden' : false,
+  },
 })